@@ -14,6 +14,8 @@ class Gate:
     """
 
     from qibo.abstractions import gates as module
+    # ``True`` for gates that represent channels
+    is_channel = False
 
     def __init__(self):
         """
@@ -323,6 +325,8 @@ class SpecialGate(Gate):
 class Channel(Gate):
     """Abstract class for channels."""
 
+    is_channel = True
+
     def __init__(self):
         super().__init__()
         self.gates = tuple()
@@ -20,8 +20,8 @@ class _ParametrizedGates(list):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.set = set()
-        self.nparams = 0
+        self.set = set(self)
+        self.nparams = sum(gate.nparams for gate in self)
 
     def append(self, gate):
         super().append(gate)
@@ -689,7 +689,7 @@ class AbstractCircuit(ABC):
         return "\n".join(logs)
 
     @abstractmethod
-    def fuse(self): # pragma: no cover
+    def fuse(self, max_qubits=2, mode="dag"): # pragma: no cover
         raise_error(NotImplementedError)
 
     @property
@@ -715,6 +715,19 @@ class AbstractCircuit(ABC):
         """Equivalent to ``circuit.execute``."""
         return self.execute(initial_state=initial_state, nshots=nshots)
 
+    def _unmasked_queue(self):
+        """Iterates the queue replacing Pauli masks by the equivalent Pauli gates.
+
+        Helper method for :meth:`qibo.abstractions.circuit.AbstractCircuit.to_qasm`
+        and :meth:`qibo.abstractions.circuit.AbstractCircuit.draw`.
+        """
+        for gate in self.queue:
+            if isinstance(gate, gates.PauliMask):
+                for q in gate.target_qubits:
+                    yield getattr(gates, gate.pauli)(q)
+            else:
+                yield gate
+
     def to_qasm(self):
         """Convert circuit to QASM.
 
@@ -735,7 +748,7 @@ class AbstractCircuit(ABC):
             code.append(f"creg {reg_name}[{len(reg_qubits)}];")
 
         # Add gates
-        for gate in self.queue:
+        for gate in self._unmasked_queue():
             if gate.name not in gates.QASM_GATES:
                 raise_error(ValueError, f"Gate {gate.name} is not supported by OpenQASM.")
             if gate.is_controlled_by:
@@ -972,7 +985,7 @@ class AbstractCircuit(ABC):
         matrix = [[] for _ in range(self.nqubits)]
         idx = [0] * self.nqubits
 
-        for gate in self.queue:
+        for gate in self._unmasked_queue():
             if gate.name not in labels:
                 raise_error(NotImplementedError, f"{gate.name} gate is not supported by `circuit.draw`")
             gate_name = labels.get(gate.name)
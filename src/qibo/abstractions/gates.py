@@ -1666,8 +1666,8 @@ class FusedGate(Gate):
     This gate is constructed automatically by :meth:`qibo.core.circuit.Circuit.fuse`
     and should not be used by user.
     :class:`qibo.abstractions.gates.FusedGate` works with arbitrary number of
-    target qubits however the backend implementation
-    :class:`qibo.core.gates.FusedGate` assumes two target qubits.
+    target qubits however backends that use custom operators support up to
+    two target qubits.
     """
 
     def __init__(self, *q):
@@ -1696,3 +1696,53 @@ class FusedGate(Gate):
         for gate in self.gates[::-1]:
             dagger.add(gate.dagger())
         return dagger
+
+
+class PauliMask(Gate):
+    """Same Pauli operator applied to multiple qubits as a single gate.
+
+    Implements :math:`P^{\\otimes k}` on the ``k`` target qubits, where
+    :math:`P` is one of the Pauli operators. The backend implementation
+    :class:`qibo.core.gates.PauliMask` applies all the Paulis in a single
+    update of the state instead of updating the state once per qubit.
+    This gate is constructed automatically by :meth:`qibo.core.circuit.Circuit.fuse`
+    and by :class:`qibo.abstractions.gates.PauliNoiseChannel` and should not
+    be used by user.
+
+    Args:
+        *q (int): the qubit ids that the Pauli operator acts on.
+    """
+    pauli = None
+
+    def __init__(self, *q):
+        super().__init__()
+        self.name = "{}mask".format(self.pauli.lower())
+        self.target_qubits = tuple(q)
+        self.init_args = list(q)
+
+
+class XMask(PauliMask):
+    """Pauli X gate applied to multiple qubits.
+
+    Args:
+        *q (int): the qubit ids that the X gate acts on.
+    """
+    pauli = "X"
+
+
+class YMask(PauliMask):
+    """Pauli Y gate applied to multiple qubits.
+
+    Args:
+        *q (int): the qubit ids that the Y gate acts on.
+    """
+    pauli = "Y"
+
+
+class ZMask(PauliMask):
+    """Pauli Z gate applied to multiple qubits.
+
+    Args:
+        *q (int): the qubit ids that the Z gate acts on.
+    """
+    pauli = "Z"
@@ -65,12 +65,12 @@ class Backend:
         # raise performance warning if qibojit and qibotf are not available
         self.show_config()
         if str(self) == "numpy":  # pragma: no cover
-            log.warning("numpy backend uses `np.einsum` and supports CPU only. "
+            log.warning("numpy backend uses `np.matmul` and supports CPU only. "
                         "Consider installing the qibojit or qibotf backends for "
                         "increased performance and to enable GPU acceleration.")
         elif str(self) == "tensorflow":  # pragma: no cover
             # case not tested because CI has tf installed
-            log.warning("qibotf library was not found. `tf.einsum` will be "
+            log.warning("qibotf library was not found. `tf.matmul` will be "
                         "used to apply gates. In order to install Qibo's "
                         "high performance custom operators for TensorFlow "
                         "please use `pip install qibotf`. Alternatively, "
@@ -187,8 +187,8 @@ def set_backend(backend="qibojit", platform=None):
     The following backends are available:
     'qibojit': Numba/cupy backend with custom operators for applying gates,
     'qibotf': Tensorflow backend with custom operators for applying gates,
-    'tensorflow': Tensorflow backend that applies gates using ``tf.einsum``,
-    'numpy': Numpy backend that applies gates using ``np.einsum``.
+    'tensorflow': Tensorflow backend that applies gates using ``tf.matmul``,
+    'numpy': Numpy backend that applies gates using ``np.matmul``.
 
     Args:
         backend (str): A backend from the above options.
@@ -384,6 +384,11 @@ class AbstractBackend(ABC):
         """Tensor transpose."""
         raise_error(NotImplementedError)
 
+    @abstractmethod
+    def flip(self, x, axis): # pragma: no cover
+        """Returns a new tensor with the order of elements reversed along the given axes."""
+        raise_error(NotImplementedError)
+
     @abstractmethod
     def inv(self, x): # pragma: no cover
         """Matrix inversion."""
@@ -520,7 +525,7 @@ class AbstractBackend(ABC):
     def create_gate_cache(self, gate): # pragma: no cover
         """Calculates data required for applying gates to states.
 
-        These can be einsum index strings or tensors of qubit ids and it
+        These can be transpose orders or tensors of qubit ids and it
         depends on the underlying backend.
 
         Args:
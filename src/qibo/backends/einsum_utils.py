@@ -1,106 +1,142 @@
 # -*- coding: utf-8 -*-
 # @authors: S. Efthymiou
 """
-Gates use ``einsum`` to apply gates to state vectors. The einsum string that
-specifies the contraction indices is created and cached when a gate is created
-so that it is not recalculated every time the gate is called on a state. This
+Gates are applied to states by transposing the target qubit legs of the state
+to the front, reshaping it to a ``(2 ** ntargets, -1)`` matrix and performing
+a single matrix multiplication with the gate matrix. The transpose orders
+required for this are created and cached when a gate is created so that they
+are not recalculated every time the gate is called on a state. This
 functionality is implemented in :class:`qibo.backends.numpy.NumpyBackend`.
+
+Two-qubit gates, which include all gates created by circuit fusion, acting on
+states with up to ``MAX_GATHER_LEGS`` legs skip the transposes and gather the
+four amplitudes each matrix row acts on directly from the flat state using
+precomputed indices. For larger states the index arrays cost as much memory
+as the state and gathering is slower than transposing.
+
+One-qubit gates acting on state vectors do not need any transposes either:
+the state is reshaped to ``(2 ** q, 2, 2 ** (nqubits - q - 1))`` and the
+matrix is broadcasted over the outer legs.
 """
-from qibo.config import raise_error
+import numpy as np
+from functools import lru_cache
+
+# Maximum number of state legs for which two-qubit gates use gather indices
+MAX_GATHER_LEGS = 12
+
+
+@lru_cache(maxsize=None)
+def transpose_orders(axes, ndim):
+    """Calculates the transpose orders used to apply a matrix on some tensor legs.
+
+    Args:
+        axes (tuple): Tensor legs that the matrix is applied to.
+        ndim (int): Total number of legs of the tensor.
+
+    Returns:
+        ``(forward, reverse)`` tuple with the order that moves ``axes`` to
+        the front of the tensor and the order that moves them back to
+        their original positions.
+    """
+    forward = tuple(axes) + tuple(i for i in range(ndim) if i not in axes)
+    return forward, tuple(ControlCache.revert(forward))
+
+
+@lru_cache(maxsize=256)
+def two_qubit_indices(q0, q1, nqubits):
+    """Calculates the flat state indices used to apply a two-qubit matrix.
+
+    For every one of the ``2 ** (nqubits - 2)`` outer indices the bits of
+    ``q0`` and ``q1`` are interleaved, giving the four base indices that the
+    rows of the ``(4, 4)`` matrix act on.
+
+    Args:
+        q0 (int): First target leg. Corresponds to the most significant bit
+            of the matrix index.
+        q1 (int): Second target leg.
+        nqubits (int): Total number of legs of the flat state.
+
+    Returns:
+        ``(targets, inverse)`` tuple where ``targets`` is an array of shape
+        ``(4, 2 ** (nqubits - 2))`` with the indices gathered before the
+        multiplication and ``inverse`` is the permutation that puts the
+        flattened result back to the original order.
+    """
+    m0, m1 = 1 << (nqubits - q0 - 1), 1 << (nqubits - q1 - 1)
+    lo, hi = sorted((m0, m1))
+    base = np.arange(2 ** (nqubits - 2), dtype=np.int64)
+    base = ((base & ~(lo - 1)) << 1) | (base & (lo - 1))
+    base = ((base & ~(hi - 1)) << 1) | (base & (hi - 1))
+    targets = np.stack([base, base | m1, base | m0, base | m0 | m1])
+    inverse = np.argsort(targets.ravel())
+    return targets, inverse
 
 
-class EinsumCache:
-    """Cache object required to apply gates using ``einsum``.
+class MatmulCache:
+    """Cache object required to apply gates using matrix multiplication.
 
-    ``circuit.calculation_cache`` is an object of this class.
+    ``gate.cache.calculation_cache`` is an object of this class.
 
-    ``self.vector`` returns the cache elements required for state vector
+    ``self.vector`` returns the transpose orders required for state vector
     calculations.
-    ``self.left``, ``self.right``, ``self.left0`` and ``self.right0`` return the cache
-    elements required for density matrix calculations.
+    ``self.left``, ``self.right``, ``self.left0`` and ``self.right0`` return
+    the transpose orders required for density matrix calculations.
+    ``self.vector_indices``, ``self.left_indices`` and ``self.right_indices``
+    return the gather indices used instead of transposes for two-qubit gates.
+    ``self.vector_shape`` returns the shape used instead of transposes for
+    one-qubit gates acting on state vectors.
 
     Args:
         qubits (list): List with the qubit indices that the gate is applied to.
         nqubits (int): Total number of qubits in the circuit / state vector.
         ncontrol (int): Number of control qubits for `controlled_by` gates.
     """
-    from qibo.config import EINSUM_CHARS as _chars
 
     def __init__(self, qubits, nqubits, ncontrol=None):
+        self.qubits = tuple(qubits)
         self.nqubits = nqubits
         self.ncontrol = ncontrol
-        if nqubits + len(qubits) > len(self._chars): # pragma: no cover
-            raise_error(NotImplementedError, "Not enough einsum characters.")
 
-        input_state = list(self._chars[:nqubits])
-        output_state = input_state[:]
-        gate_chars = list(self._chars[nqubits : nqubits + len(qubits)])
-
-        for i, q in enumerate(qubits):
-            gate_chars.append(input_state[q])
-            output_state[q] = gate_chars[i]
+    @property
+    def vector(self):
+        return transpose_orders(self.qubits, self.nqubits)
 
-        self.input = "".join(input_state)
-        self.output = "".join(output_state)
-        self.gate = "".join(gate_chars)
-        self.rest = self._chars[nqubits + len(qubits):]
+    @property
+    def left(self):
+        return transpose_orders(self.qubits, 2 * self.nqubits)
 
-        # Cache for state vectors
-        self._vector = f"{self.input},{self.gate}->{self.output}"
+    @property
+    def right(self):
+        axes = tuple(q + self.nqubits for q in self.qubits)
+        return transpose_orders(axes, 2 * self.nqubits)
 
-        # Cache for density matrices
-        self._left = None
-        self._right = None
-        self._left0 = None
-        self._right0 = None
+    @property
+    def vector_shape(self):
+        q = self.qubits[0]
+        return (2 ** q, 2, 2 ** (self.nqubits - q - 1))
 
     @property
-    def vector(self):
-        if self._vector is None: # pragma: no cover
-            # abstract method
-            raise_error(NotImplementedError, "Vector cache should be defined in __init__.")
-        return self._vector
+    def vector_indices(self):
+        return two_qubit_indices(*self.qubits, self.nqubits)
 
     @property
-    def left(self):
-        if self._left is None: # pragma: no cover
-            self._calculate_density_matrix()
-        return self._left
+    def left_indices(self):
+        return two_qubit_indices(*self.qubits, 2 * self.nqubits)
 
     @property
-    def right(self):
-        if self._right is None:
-            self._calculate_density_matrix()
-        return self._right
+    def right_indices(self):
+        q0, q1 = (q + self.nqubits for q in self.qubits)
+        return two_qubit_indices(q0, q1, 2 * self.nqubits)
 
     @property
     def left0(self):
-        if self._left0 is None: # pragma: no cover
-            self._calculate_density_matrix_controlled()
-        return self._left0
+        axes = tuple(q + 1 for q in self.qubits)
+        return transpose_orders(axes, 2 * self.nqubits + 1)
 
     @property
     def right0(self):
-        if self._right0 is None:
-            self._calculate_density_matrix_controlled()
-        return self._right0
-
-    def _calculate_density_matrix(self):
-        """Calculates `left` and `right` elements."""
-        if self.nqubits > len(self.rest): # pragma: no cover
-            raise_error(NotImplementedError, "Not enough einsum characters.")
-
-        rest = self.rest[:self.nqubits]
-        self._left = f"{self.input}{rest},{self.gate}->{self.output}{rest}"
-        self._right = f"{rest}{self.input},{self.gate}->{rest}{self.output}"
-
-    def _calculate_density_matrix_controlled(self):
-        """Calculates `left0` and `right0` elements."""
-        if self.nqubits + 1 > len(self.rest): # pragma: no cover
-            raise_error(NotImplementedError, "Not enough einsum characters.")
-        rest, c = self.rest[:self.nqubits], self.rest[self.nqubits]
-        self._left0 = f"{c}{self.input}{rest},{self.gate}->{c}{self.output}{rest}"
-        self._right0 = f"{c}{rest}{self.input},{self.gate}->{c}{rest}{self.output}"
+        axes = tuple(q + self.nqubits + 1 for q in self.qubits)
+        return transpose_orders(axes, 2 * self.nqubits + 1)
 
 
 class ControlCache:
@@ -1,11 +1,10 @@
-import math
 from qibo.backends import abstract, einsum_utils
 from qibo.config import raise_error, log
 
 
 class NumpyBackend(abstract.AbstractBackend):
 
-    description = "Uses `np.einsum` to apply gates to states via matrix " \
+    description = "Uses `np.matmul` to apply gates to states via matrix " \
                   "multiplication."
 
     TEST_REGRESSIONS = {
@@ -200,6 +199,10 @@ class NumpyBackend(abstract.AbstractBackend):
     def transpose(self, x, axes=None):
         return self.backend.transpose(x, axes)
 
+    def flip(self, x, axis):
+        # copy so that the result does not share memory with ``x``
+        return self.backend.ascontiguousarray(self.backend.flip(x, axis))
+
     def inv(self, x):
         return self.backend.linalg.inv(x)
 
@@ -293,10 +296,70 @@ class NumpyBackend(abstract.AbstractBackend):
         self.backend.random.seed(seed)
 
     def create_einsum_cache(self, qubits, nqubits, ncontrol=None):
-        return einsum_utils.EinsumCache(qubits, nqubits, ncontrol)
+        return einsum_utils.MatmulCache(qubits, nqubits, ncontrol)
+
+    def matmul_call(self, orders, state, matrix):
+        """Applies ``matrix`` to the legs of ``state`` specified by ``orders``.
 
-    def einsum_call(self, cache, state, matrix):
-        return self.einsum(cache, state, matrix)
+        The target legs are transposed to the front and the state is unfolded
+        to a ``(2 ** ntargets, -1)`` matrix so that the gate is applied via a
+        single matrix multiplication instead of ``einsum``.
+
+        Args:
+            orders (tuple): ``(forward, reverse)`` transpose orders as
+                returned by :class:`qibo.backends.einsum_utils.MatmulCache`.
+            state: State tensor with all legs of dimension 2 (except possibly
+                the first leg in the case of ``controlled_by`` gates).
+            matrix: Gate matrix of shape ``(2 ** ntargets, 2 ** ntargets)``.
+        """
+        forward, reverse = orders
+        state = self.transpose(state, forward)
+        shape = tuple(state.shape)
+        state = self.reshape(state, (int(matrix.shape[0]), -1))
+        state = self.reshape(self.matmul(matrix, state), shape)
+        return self.transpose(state, reverse)
+
+    def one_qubit_call(self, shape, state, matrix):
+        """Applies a ``(2, 2)`` matrix to a state vector without transposes.
+
+        Args:
+            shape (tuple): ``(2 ** q, 2, 2 ** (nqubits - q - 1))`` shape as
+                returned by :class:`qibo.backends.einsum_utils.MatmulCache`
+                for target qubit ``q``.
+            state: State vector to apply the matrix to.
+            matrix: ``(2, 2)`` matrix to apply.
+
+        Returns:
+            The updated state with shape ``shape``.
+        """
+        ntrailing = int(shape[-1])
+        if ntrailing <= 4:
+            # broadcasting over short trailing legs is slow so the matrix
+            # is extended to these legs and multiplied from the right instead
+            matrix = self.kron(matrix, self.eye(ntrailing, dtype=matrix.dtype))
+            state = self.reshape(state, (-1, 2 * ntrailing))
+            return self.matmul(state, self.transpose(matrix))
+        return self.matmul(matrix, self.reshape(state, shape))
+
+    def two_qubit_call(self, indices, shape, state, matrix):
+        """Applies a ``(4, 4)`` matrix to a state using gather indices.
+
+        Avoids the transposes of :meth:`qibo.backends.numpy.NumpyBackend.matmul_call`
+        which dominate the cost of two-qubit gates for small numbers of qubits.
+
+        Args:
+            indices (tuple): ``(targets, inverse)`` indices as returned by
+                :meth:`qibo.backends.einsum_utils.two_qubit_indices`.
+            shape (tuple): Shape of the returned state.
+            state: State tensor to apply the matrix to.
+            matrix: ``(4, 4)`` matrix to apply.
+
+        Returns:
+            The updated state.
+        """
+        targets, inverse = indices
+        state = self.np.matmul(matrix, state.reshape(-1)[targets])
+        return state.reshape(-1)[inverse].reshape(shape)
 
     class GateCache:
         pass
@@ -315,45 +378,78 @@ class NumpyBackend(abstract.AbstractBackend):
                 targets, nactive, ncontrol)
         else:
             cache.calculation_cache = self.create_einsum_cache(gate.qubits, gate.nqubits)
+
+        # two-qubit gates acting on small states are applied using gather
+        # indices specific to their target qubits, see ``two_qubit_call``.
+        # Channels are excluded as they are applied via their superoperator.
+        cache.use_two_qubit_kernels = (
+            not gate.is_controlled_by and len(gate.qubits) == 2 and
+            not gate.is_channel and
+            s * gate.nqubits <= einsum_utils.MAX_GATHER_LEGS)
+        cache.two_qubit_indices = None
+        cache.two_qubit_shape = s * (2 ** gate.nqubits,)
         return cache
 
-    def reshape_matrix(self, matrix):
-        """Reshapes the gate matrix to the tensor shape.
+    def _two_qubit_indices(self, gate):
+        """Returns the gather indices of ``gate`` creating them on first use.
 
-        Helper method for gate calls.
+        Returns ``None`` if the gate is applied using ``matmul_call``.
+        For density matrices the indices of the left and right side are
+        returned, otherwise a single set of indices.
         """
-        rank = int(math.log2(int(matrix.shape[0])))
-        return self.reshape(matrix, 2 * rank * (2,))
+        cache = gate.cache
+        if cache.two_qubit_indices is None and cache.use_two_qubit_kernels:
+            calc_cache = cache.calculation_cache
+            if gate.density_matrix:
+                cache.two_qubit_indices = (calc_cache.left_indices,
+                                           calc_cache.right_indices)
+            else:
+                cache.two_qubit_indices = (calc_cache.vector_indices,)
+        return cache.two_qubit_indices
 
     def _state_vector_call(self, gate, state):
+        matrix = gate.native_op_matrix
+        indices = self._two_qubit_indices(gate)
+        if indices is not None:
+            return self.two_qubit_call(indices[0], gate.cache.two_qubit_shape,
+                                       state, matrix)
+
         state = self.reshape(state, gate.cache.tensor_shape)
-        matrix = self.reshape_matrix(gate.native_op_matrix)
         if gate.is_controlled_by:
             ncontrol = len(gate.control_qubits)
             nactive = gate.nqubits - ncontrol
             state = self.transpose(state, gate.cache.control_cache.order(False))
-            # Apply `einsum` only to the part of the state where all controls
+            # Apply the matrix only to the part of the state where all controls
             # are active. This should be `state[-1]`
             state = self.reshape(state, (2 ** ncontrol,) + nactive * (2,))
-            updates = self.einsum_call(gate.cache.calculation_cache.vector, state[-1], matrix)
+            updates = self.matmul_call(gate.cache.calculation_cache.vector, state[-1], matrix)
             # Concatenate the updated part of the state `updates` with the
             # part of of the state that remained unaffected `state[:-1]`.
             state = self.concatenate([state[:-1], updates[self.newaxis]], axis=0)
             state = self.reshape(state, gate.nqubits * (2,))
             # Put qubit indices back to their proper places
             state = self.transpose(state, gate.cache.control_cache.reverse(False))
+        elif len(gate.cache.calculation_cache.qubits) == 1:
+            state = self.one_qubit_call(gate.cache.calculation_cache.vector_shape,
+                                        state, matrix)
         else:
-            einsum_str = gate.cache.calculation_cache.vector
-            state = self.einsum_call(einsum_str, state, matrix)
+            state = self.matmul_call(gate.cache.calculation_cache.vector, state, matrix)
         return self.reshape(state, gate.cache.flat_shape)
 
     def state_vector_matrix_call(self, gate, state):
         return self._state_vector_call(gate, state)
 
     def _density_matrix_call(self, gate, state):
-        state = self.reshape(state, gate.cache.tensor_shape)
-        matrix = self.reshape_matrix(gate.native_op_matrix)
+        matrix = gate.native_op_matrix
         matrixc = self.conj(matrix)
+        indices = self._two_qubit_indices(gate)
+        if indices is not None:
+            left, right = indices
+            shape = gate.cache.two_qubit_shape
+            state = self.two_qubit_call(right, shape, state, matrixc)
+            return self.two_qubit_call(left, shape, state, matrix)
+
+        state = self.reshape(state, gate.cache.tensor_shape)
         if gate.is_controlled_by:
             ncontrol = len(gate.control_qubits)
             nactive = gate.nqubits - ncontrol
@@ -362,16 +458,16 @@ class NumpyBackend(abstract.AbstractBackend):
             state = self.reshape(state, 2 * (n,) + 2 * nactive * (2,))
             state01 = self.gather(state, indices=range(n - 1), axis=0)
             state01 = self.squeeze(self.gather(state01, indices=[n - 1], axis=1), axis=1)
-            state01 = self.einsum_call(gate.cache.calculation_cache.right0, state01, matrixc)
+            state01 = self.matmul_call(gate.cache.calculation_cache.right0, state01, matrixc)
             state10 = self.gather(state, indices=range(n - 1), axis=1)
             state10 = self.squeeze(self.gather(state10, indices=[n - 1], axis=0), axis=0)
-            state10 = self.einsum_call(gate.cache.calculation_cache.left0,
+            state10 = self.matmul_call(gate.cache.calculation_cache.left0,
                                        state10, matrix)
 
             state11 = self.squeeze(self.gather(state, indices=[n - 1], axis=0), axis=0)
             state11 = self.squeeze(self.gather(state11, indices=[n - 1], axis=0), axis=0)
-            state11 = self.einsum_call(gate.cache.calculation_cache.right, state11, matrixc)
-            state11 = self.einsum_call(gate.cache.calculation_cache.left, state11, matrix)
+            state11 = self.matmul_call(gate.cache.calculation_cache.right, state11, matrixc)
+            state11 = self.matmul_call(gate.cache.calculation_cache.left, state11, matrix)
 
             state00 = self.gather(state, indices=range(n - 1), axis=0)
             state00 = self.gather(state00, indices=range(n - 1), axis=1)
@@ -381,8 +477,8 @@ class NumpyBackend(abstract.AbstractBackend):
             state = self.reshape(state, 2 * gate.nqubits * (2,))
             state = self.transpose(state, gate.cache.control_cache.reverse(True))
         else:
-            state = self.einsum_call(gate.cache.calculation_cache.right, state, matrixc)
-            state = self.einsum_call(gate.cache.calculation_cache.left, state, matrix)
+            state = self.matmul_call(gate.cache.calculation_cache.right, state, matrixc)
+            state = self.matmul_call(gate.cache.calculation_cache.left, state, matrix)
         return self.reshape(state, gate.cache.flat_shape)
 
     def density_matrix_matrix_call(self, gate, state):
@@ -393,9 +489,14 @@ class NumpyBackend(abstract.AbstractBackend):
             raise_error(NotImplementedError, "Gate density matrix half call is "
                                              "not implemented for ``controlled_by``"
                                              "gates.")
-        matrix = self.reshape_matrix(gate.native_op_matrix)
+        matrix = gate.native_op_matrix
+        indices = self._two_qubit_indices(gate)
+        if indices is not None:
+            return self.two_qubit_call(indices[0], gate.cache.two_qubit_shape,
+                                       state, matrix)
+
         state = self.reshape(state, gate.cache.tensor_shape)
-        state = self.einsum_call(gate.cache.calculation_cache.left, state, matrix)
+        state = self.matmul_call(gate.cache.calculation_cache.left, state, matrix)
         return self.reshape(state, gate.cache.flat_shape)
 
     def density_matrix_half_matrix_call(self, gate, state):
@@ -15,7 +15,7 @@ class Optimization:
 
 class TensorflowBackend(NumpyBackend):
 
-    description = "Uses `tf.einsum` to apply gates to states via matrix " \
+    description = "Uses `tf.matmul` to apply gates to states via matrix " \
                   "multiplication."
 
     TEST_REGRESSIONS_CPU = {
@@ -194,6 +194,9 @@ class TensorflowBackend(NumpyBackend):
         z = self.transpose(self.outer(x, y), axes=[0, 2, 1, 3])
         return self.reshape(z, (dim, dim))
 
+    def flip(self, x, axis):
+        return self.backend.reverse(x, axis=list(axis))
+
     def inv(self, x):
         raise_error(NotImplementedError)
 
@@ -215,6 +218,12 @@ class TensorflowBackend(NumpyBackend):
         indices = self.backend.where(condition)
         return self.backend.gather(x, indices, axis=axis)[:, 0]
 
+    def two_qubit_call(self, indices, shape, state, matrix):
+        targets, inverse = indices
+        tf = self.backend
+        state = tf.matmul(matrix, tf.gather(tf.reshape(state, (-1,)), targets))
+        return tf.reshape(tf.gather(tf.reshape(state, (-1,)), inverse), shape)
+
     def gather_nd(self, x, indices):
         return self.backend.gather_nd(x, indices)
 
@@ -33,14 +33,85 @@ class BackendCallback(abstract_callbacks.Callback, ABC):
             state = state.tensor
         return getattr(self, self._active_call)(state)
 
+    def record(self, state):
+        """Evaluates the callback on the given state and stores the result."""
+        self.append(self(state))
+
 
 class EntanglementEntropy(BackendCallback, abstract_callbacks.EntanglementEntropy):
 
+    # only reduced density matrices up to this dimension are buffered by
+    # ``record`` and the buffer is flushed when it holds ``buffer_size`` of them
+    buffer_max_dim = 4
+    buffer_size = 64
+
     def __init__(self, partition=None, compute_spectrum=False):
+        self._spectrum = []
+        # reduced density matrices recorded but not yet diagonalized
+        self._buffer = []
         abstract_callbacks.EntanglementEntropy.__init__(
             self, partition, compute_spectrum)
         self.partial_trace = None
 
+    @property
+    def results(self):
+        self._flush()
+        return self._results
+
+    @property
+    def spectrum(self):
+        self._flush()
+        return self._spectrum
+
+    @spectrum.setter
+    def spectrum(self, x):
+        self._spectrum = x
+
+    def __getitem__(self, k):
+        self._flush()
+        return super().__getitem__(k)
+
+    def __call__(self, state):
+        self._flush()
+        return super().__call__(state)
+
+    def append(self, x):
+        self._flush()
+        self._results.append(x)
+
+    def extend(self, x):
+        self._flush()
+        self._results.extend(x)
+
+    def record(self, state):
+        """Calculates the entropy of the given state and stores it in the results.
+
+        Small reduced density matrices are buffered so that their entropies
+        are calculated together, using a single batched diagonalization, when
+        the results are accessed or ``buffer_size`` matrices are held.
+        Larger reduced density matrices are diagonalized immediately.
+        """
+        if isinstance(state, AbstractState):
+            state = state.tensor
+        self._set_nqubits(state)
+        if self.density_matrix:
+            rho = self.partial_trace.density_matrix_partial_trace(state)
+        else:
+            rho = self.partial_trace.state_vector_partial_trace(state)
+        if int(tuple(rho.shape)[0]) > self.buffer_max_dim:
+            self.append(self.entropy(rho))
+        else:
+            self._buffer.append(rho)
+            if len(self._buffer) >= self.buffer_size:
+                self._flush()
+
+    def _flush(self):
+        """Calculates the entropies of the buffered reduced density matrices."""
+        if self._buffer:
+            rhos, self._buffer = self._buffer, []
+            entropies = self.entropy(K.stack(rhos))
+            self._results.extend(entropies[i] for i in range(len(rhos)))
+
     @abstract_callbacks.Callback.density_matrix.setter
     def density_matrix(self, x):
         abstract_callbacks.Callback.density_matrix.fset(self, x) # pylint: disable=no-member
@@ -64,16 +135,27 @@ class EntanglementEntropy(BackendCallback, abstract_callbacks.EntanglementEntrop
         self.partial_trace.density_matrix = self.density_matrix
 
     def entropy(self, rho):
-        """Calculates entropy of a density matrix via exact diagonalization."""
+        """Calculates entropy of a density matrix via exact diagonalization.
+
+        If ``rho`` is a batch of density matrices with shape ``(T, d, d)``
+        all matrices are diagonalized in a single call and a tensor with
+        the ``T`` entropies is returned.
+        """
         # Diagonalize
         eigvals = K.real(K.eigvalsh(rho))
         # Treating zero and negative eigenvalues
         drop_condition = eigvals > EIGVAL_CUTOFF
-        masked_eigvals = K.gather(eigvals, condition=drop_condition)
-        spectrum = -1 * K.log(masked_eigvals)
+        mask = K.cast(drop_condition, dtype=eigvals.dtype)
+        masked_eigvals = eigvals * mask
+        # dropped eigenvalues are shifted to one so that their logarithm vanishes
+        spectrum = -1 * K.log(masked_eigvals + 1 - mask)
         if self.compute_spectrum:
-            self.spectrum.append(spectrum)
-        entropy = K.sum(masked_eigvals * spectrum)
+            if len(tuple(rho.shape)) > 2:
+                for i in range(tuple(rho.shape)[0]):
+                    self._spectrum.append(K.gather(spectrum[i], condition=drop_condition[i]))
+            else:
+                self._spectrum.append(K.gather(spectrum, condition=drop_condition))
+        entropy = K.sum(masked_eigvals * spectrum, axis=-1)
         return entropy / math.log(2.0)
 
     def _set_nqubits(self, state):
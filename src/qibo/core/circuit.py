@@ -8,6 +8,29 @@ from qibo.core import states, measurements
 from typing import List, Tuple
 
 
+class _FusionGroup:
+    """Group of gates that is fused to a single gate by :meth:`qibo.core.circuit.Circuit.fuse`.
+
+    Args:
+        index (int): Position of the group in the fused circuit queue.
+        qubits (set): Qubit ids that the gates of the group act on.
+        gate: Optional first gate of the group.
+        fusable (bool): ``False`` if the group holds a single gate that cannot
+            be fused with other gates.
+    """
+
+    def __init__(self, index, qubits, gate=None, fusable=True):
+        self.index = index
+        self.qubits = set(qubits)
+        self.gates = [] if gate is None else [gate]
+        self.fusable = fusable
+
+    def absorb(self, group):
+        """Moves the gates of an earlier independent ``group`` to this group."""
+        self.qubits |= group.qubits
+        self.gates = group.gates + self.gates
+
+
 class Circuit(circuit.AbstractCircuit):
     """Backend implementation of :class:`qibo.abstractions.circuit.AbstractCircuit`.
 
@@ -46,8 +69,16 @@ class Circuit(circuit.AbstractCircuit):
             self._set_nqubits(gate.additional_unitary)
             self.queue.append(gate.additional_unitary)
 
-    def fuse(self):
-        """Creates an equivalent circuit with the gates fused up to two-qubits.
+    def fuse(self, max_qubits=2, mode="dag"):
+        """Creates an equivalent circuit with the gates fused up to ``max_qubits``.
+
+        Args:
+            max_qubits (int): Maximum number of target qubits of the fused
+                gates. Default is two which is supported by all backends.
+            mode (str): Fusion algorithm to use. ``"dag"`` (default) fuses
+                gates following the dependency graph of the circuit, while
+                ``"layer"`` fuses the gates of each circuit layer to a single
+                gate of up to ``max_qubits`` qubits.
 
         Returns:
             A :class:`qibo.core.circuit.Circuit` object containing
@@ -71,117 +102,174 @@ class Circuit(circuit.AbstractCircuit):
         """
         from qibo import gates
         from qibo.abstractions.circuit import _Queue
-        from qibo.abstractions.abstract_gates import SpecialGate
-
-        class FusedQueue(_Queue):
-            """Helper queue implementation that checks if a gate already exists
-            in queue to avoid re-appending it.
-            """
-
-            def __init__(self, *args, **kwargs):
-                super().__init__(*args, **kwargs)
-                self.set = set()
-
-            def append(self, gate):
-                """Appends a gate in queue only if it is not already in."""
-                # Use a ``set`` instead of the original ``list`` to check if
-                # the gate already exists in queue as lookup is typically
-                # more efficient for sets
-                # (although actual performance difference is probably negligible)
-                if gate not in self.set:
-                    self.set.add(gate)
-                    super().append(gate)
-
-        # new circuit queue that will hold the fused gates
-        fused_queue = FusedQueue(self.nqubits)
-        # dictionary that maps each qubit id (int) to the corresponding
-        # active ``FusedGate`` that is part of
-        fused_gates = collections.OrderedDict()
-        # use ``OrderedDict`` so that the original gate order is not changed
-        for gate in self.queue:
-            qubits = gate.qubits
-            if len(qubits) == 1:
-                # add one-qubit gates to the active ``FusedGate`` of this qubit
-                # or create a new one if it does not exist
-                q = qubits[0]
-                if q not in fused_gates:
-                    fused_gates[q] = gates.FusedGate(q)
-                fused_gates.get(q).add(gate)
-
-            elif len(qubits) == 2:
-                # fuse two-qubit gates
-                q0, q1 = tuple(sorted(qubits))
-                if (q0 in fused_gates and q1 in fused_gates and
-                    fused_gates.get(q0) == fused_gates.get(q1)):
-                    # if the target qubit pair is compatible with the active
-                    # ``FusedGate`` of both qubits then add it to the ``FusedGate``
-                    fused_gates.get(q0).add(gate)
-                else:
-                    # otherwise we need to create a new ``FusedGate`` and
-                    # update the active gates of both target qubits
-                    fgate = gates.FusedGate(q0, q1)
-                    if q0 in fused_gates:
-                        # first qubit has existing active gate
-                        ogate = fused_gates.pop(q0)
-                        if len(ogate.target_qubits) == 1:
-                            # existing active gate is one-qubit so we just add
-                            # it to the new ``FusedGate``
-                            fgate.add(ogate)
-                        else:
-                            # existing active gate is two-qubit so we need to
-                            # add it to the new queue
-                            fused_queue.append(ogate)
-                    if q1 in fused_gates:
-                        # second qubit has existing active gate
-                        ogate = fused_gates.pop(q1)
-                        if len(ogate.target_qubits) == 1:
-                            # existing active gate is one-qubit so we just add
-                            # it to the new ``FusedGate``
-                            fgate.add(ogate)
-                        else:
-                            # existing active gate is two-qubit so we need to
-                            # add it to the new queue
-                            fused_queue.append(ogate)
-                    # add the two-qubit gate to the newly created ``FusedGate``
-                    # and update the active ``FusedGate``s of both target qubits
-                    fgate.add(gate)
-                    fused_gates[q0], fused_gates[q1] = fgate, fgate
-
-            elif isinstance(gate, SpecialGate):
-                # ``SpecialGate``s act on all qubits (like a barrier) so we
-                # so we need to temporarily stop the fusion, add all active
-                # gates in the new queue and restart fusion after the barrier
-                for g in fused_gates.values():
-                    fused_queue.append(g)
-                fused_gates = collections.OrderedDict()
-                fused_queue.append(gate)
-
-            else:
-                # gate has more than two target qubits so it cannot be included
-                # in the ``FusedGate``s which support up to two qubits.
-                # Therefore we deactivate the ``FusedGate``s of all target qubits
-                for q in qubits:
-                    if q in fused_gates:
-                        fused_queue.append(fused_gates.pop(q))
-                fused_queue.append(gate)
 
-        for gate in fused_gates.values():
-            # add remaining active ``FusedGate``s in the new queue
-            fused_queue.append(gate)
+        if max_qubits < 1:
+            raise_error(ValueError, "Cannot fuse gates to {} qubits."
+                                    "".format(max_qubits))
+        if mode == "dag":
+            groups = self._dag_fusion_groups(max_qubits)
+        elif mode == "layer":
+            groups = self._layer_fusion_groups(max_qubits)
+        else:
+            raise_error(ValueError, "Unknown fusion mode {}.".format(mode))
 
         queue = _Queue(self.nqubits)
-        for gate in fused_queue:
-            if isinstance(gate, gates.FusedGate) and len(gate.gates) == 1:
-                # replace ``FusedGate``s that contain only one gate by this
-                # gate for efficiency
-                gate = gate.gates[0]
-            queue.append(gate)
+        for group in groups:
+            if group is None:
+                continue
+            if len(group.gates) == 1:
+                # use the original gate instead of a ``FusedGate`` that
+                # contains only one gate for efficiency
+                queue.append(group.gates[0])
+            else:
+                fgate = gates.FusedGate(*sorted(group.qubits))
+                for gate in group.gates:
+                    fgate.add(gate)
+                queue.append(fgate)
 
         # create a circuit and assign the new queue
         new_circuit = self._shallow_copy()
-        new_circuit.queue = queue
+        new_circuit.queue = self._fuse_pauli_masks(queue)
         return new_circuit
 
+    def _fusion_qubits(self, gate, max_qubits):
+        """Returns the qubits of ``gate`` and whether it can be fused.
+
+        Helper method for :meth:`qibo.core.circuit.Circuit.fuse`.
+        """
+        from qibo.abstractions.abstract_gates import SpecialGate
+        if isinstance(gate, SpecialGate):
+            # ``SpecialGate``s act on all qubits (like a barrier)
+            return set(range(self.nqubits)), False
+        qubits = set(gate.qubits)
+        # the matrix of ``controlled_by`` gates is available up to two qubits
+        fusable = not (len(qubits) > max_qubits or
+                       (len(qubits) > 2 and gate.is_controlled_by))
+        return qubits, fusable
+
+    def _dag_fusion_groups(self, max_qubits):
+        """Groups gates following the dependency graph of the circuit.
+
+        Helper method for :meth:`qibo.core.circuit.Circuit.fuse`.
+        """
+        # groups of gates in the order they were created, ``None`` marks
+        # groups that were absorbed by a later group
+        groups = []
+        # dictionary that maps each qubit id (int) to the last group that
+        # acts on this qubit
+        last = {}
+        for gate in self.queue:
+            qubits, fusable = self._fusion_qubits(gate, max_qubits)
+            if not fusable:
+                # gate cannot be fused so it forms its own group which
+                # becomes the last group of all its qubits
+                group = _FusionGroup(len(groups), qubits, gate, fusable=False)
+                groups.append(group)
+                for q in qubits:
+                    last[q] = group
+                continue
+
+            preds = {last[q] for q in qubits if q in last}
+            preds = sorted(preds, key=lambda g: g.index)
+            # add the gate to its latest predecessor if it fits, as all other
+            # predecessors are already placed before it, otherwise
+            # start a new group
+            if (preds and preds[-1].fusable and
+                len(preds[-1].qubits | qubits) <= max_qubits):
+                group = preds.pop()
+            else:
+                group = _FusionGroup(len(groups), set())
+                groups.append(group)
+            # absorb earlier predecessors if no other group acts on their
+            # qubits after them, so they can be moved to the later group
+            for pred in preds:
+                if (pred.fusable and all(last[q] is pred for q in pred.qubits)
+                    and len(group.qubits | pred.qubits | qubits) <= max_qubits):
+                    group.absorb(pred)
+                    groups[pred.index] = None
+                    qubits |= pred.qubits
+            group.qubits |= qubits
+            group.gates.append(gate)
+            for q in qubits:
+                last[q] = group
+        return groups
+
+    def _layer_fusion_groups(self, max_qubits):
+        """Groups the gates of each circuit layer.
+
+        Helper method for :meth:`qibo.core.circuit.Circuit.fuse`.
+        Each gate is placed in the first layer that follows all layers
+        acting on its qubits. Gates of the same layer act on different
+        qubits so they commute and are grouped in the order they were added
+        until the group reaches ``max_qubits`` qubits.
+        """
+        layers = []
+        # dictionary that maps each qubit id (int) to the index of the
+        # first layer that does not act on this qubit after the last layer
+        # that does
+        depth = collections.defaultdict(int)
+        for gate in self.queue:
+            qubits, fusable = self._fusion_qubits(gate, max_qubits)
+            k = max(depth[q] for q in qubits)
+            if k == len(layers):
+                layers.append([])
+            layers[k].append((gate, qubits, fusable))
+            for q in qubits:
+                depth[q] = k + 1
+
+        groups = []
+        for layer in layers:
+            group = None
+            for gate, qubits, fusable in layer:
+                if not fusable:
+                    groups.append(_FusionGroup(len(groups), qubits, gate,
+                                               fusable=False))
+                    continue
+                if group is None or len(group.qubits | qubits) > max_qubits:
+                    group = _FusionGroup(len(groups), set())
+                    groups.append(group)
+                group.qubits |= qubits
+                group.gates.append(gate)
+        return groups
+
+    def _fuse_pauli_masks(self, queue):
+        """Merges adjacent Pauli gates of the same type to a single gate.
+
+        Helper method for :meth:`qibo.core.circuit.Circuit.fuse`.
+        Runs of ``X``, ``Y`` or ``Z`` gates that act on different qubits are
+        replaced by a :class:`qibo.core.gates.PauliMask` gate which updates
+        the state once instead of once per qubit.
+        """
+        from qibo import gates
+        from qibo.abstractions.circuit import _Queue
+        mask_types = {gates.X: gates.XMask, gates.Y: gates.YMask,
+                      gates.Z: gates.ZMask}
+
+        new_queue = _Queue(self.nqubits)
+        run = []
+        for gate in list(queue) + [None]:
+            if (run and type(gate) is type(run[0]) and
+                not gate.is_controlled_by and
+                gate.target_qubits[0] not in {g.target_qubits[0] for g in run}):
+                run.append(gate)
+                continue
+            # ``gate`` cannot be merged with the current run so the run
+            # is added in the queue as a mask or as a single Pauli gate
+            if len(run) > 1:
+                mask = mask_types.get(type(run[0]))(
+                    *(g.target_qubits[0] for g in run))
+                self._set_nqubits(mask)
+                mask.density_matrix = self.density_matrix
+                new_queue.append(mask)
+            elif run:
+                new_queue.append(run[0])
+            run = []
+            if type(gate) in mask_types and not gate.is_controlled_by:
+                run.append(gate)
+            elif gate is not None:
+                new_queue.append(gate)
+        return new_queue
+
     def _eager_execute(self, state):
         """Simulates the circuit gates in eager mode."""
         for gate in self.queue:
@@ -80,7 +80,7 @@ class DistributedCircuit(circuit.Circuit):
                                     "circuits because they modify gate objects.")
         return super().copy(deep)
 
-    def fuse(self):
+    def fuse(self, max_qubits=2, mode="dag"):
         raise_error(NotImplementedError, "Fusion is not implemented for "
                                          "distributed circuits.")
 
@@ -168,7 +168,9 @@ class DistributedCircuit(circuit.Circuit):
             full_state = state.tensor
         with K.on_cpu():
             if isinstance(gate, gates.CallbackGate):
-                gate(full_state)
+                # evaluate the callback immediately instead of recording it,
+                # so that its calculation runs on CPU
+                gate.callback.append(gate.callback(full_state))
             else:
                 full_state = gate(full_state)
                 state.assign_pieces(full_state)
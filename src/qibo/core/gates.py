@@ -40,6 +40,39 @@ class BackendGate(BaseBackendGate):
         part2 = K.concatenate([zeros, unitary], axis=0)
         return K.concatenate([part1, part2], axis=1)
 
+    @staticmethod
+    def _full_matrix(gate):
+        """Returns the matrix of ``gate`` acting on all ``gate.qubits``.
+
+        Unlike ``gate.matrix`` this also works for gates with more than two
+        target qubits, as long as these are not ``controlled_by`` gates.
+        """
+        if len(gate.qubits) > 2:
+            return gate.native_op_matrix
+        return gate.matrix
+
+    @staticmethod
+    def _expand_matrix(matrix, qubits, targets):
+        """Expands a numpy ``matrix`` acting on ``qubits`` to act on ``targets``.
+
+        ``qubits`` should be a subset of ``targets``. The matrix is extended
+        with identity on the remaining targets and its legs are transposed
+        to follow the order of ``targets``.
+        """
+        qubits = list(qubits)
+        rest = [q for q in targets if q not in qubits]
+        if rest:
+            matrix = K.qnp.kron(matrix, K.qnp.eye(2 ** len(rest)))
+        order = qubits + rest
+        if order == list(targets):
+            return matrix
+        # transpose the legs from ``qubits + rest`` to the ``targets`` order
+        n = len(order)
+        perm = [order.index(q) for q in targets]
+        matrix = K.qnp.reshape(matrix, 2 * n * (2,))
+        matrix = K.qnp.transpose(matrix, perm + [p + n for p in perm])
+        return K.qnp.reshape(matrix, 2 * (2 ** n,))
+
     def _reset_unitary(self):
         super()._reset_unitary()
         self._native_op_matrix = None
@@ -811,7 +844,7 @@ class CallbackGate(BackendGate, abstract_gates.CallbackGate):
                                 "representation.")
 
     def _state_vector_call(self, state):
-        self.callback.append(self.callback(state))
+        self.callback.record(state)
         return state
 
     def _density_matrix_call(self, state):
@@ -839,11 +872,10 @@ class PartialTrace(BackendGate, abstract_gates.PartialTrace):
             rows = K.zeros(shape, dtype='DTYPECPX')
             cache.zero_matrix = K.concatenate([row0[K.newaxis], rows], axis=0)
             cache.zero_matrix = K.reshape(cache.zero_matrix, 2 * n * (2,))
-            # Calculate initial transpose order
-            order = tuple(sorted(self.target_qubits))
-            order += tuple(i for i in range(self.nqubits) if i not in qubits)
-            order += tuple(i + self.nqubits for i in order)
-            cache.einsum_order = order
+            # Contraction string for the partial trace that is applied
+            # directly on the state tensor without transposing it first
+            cache.einsum_string = abstract_gates.M.einsum_string(
+                qubits, self.nqubits)
             # Calculate final transpose order
             order1 = tuple(i for i in range(self.nqubits) if i not in qubits)
             order2 = tuple(self.target_qubits)
@@ -851,7 +883,6 @@ class PartialTrace(BackendGate, abstract_gates.PartialTrace):
                      order2 + tuple(i + self.nqubits for i in order2))
             cache.final_order = tuple(order.index(i) for i in range(2 * self.nqubits))
             # Shapes
-            cache.einsum_shape = K.cast(2 * (2 ** n, 2 ** (self.nqubits - n)), dtype='DTYPEINT')
             cache.output_shape = K.cast(2 * (2 ** self.nqubits,), dtype='DTYPEINT')
             cache.reduced_shape = K.cast(2 * (2 ** (self.nqubits - n),), dtype='DTYPEINT')
             self._cache = cache
@@ -871,9 +902,8 @@ class PartialTrace(BackendGate, abstract_gates.PartialTrace):
     def density_matrix_partial_trace(self, state):
         self._set_nqubits(state)
         state = K.reshape(state, 2 * self.nqubits * (2,))
-        state = K.transpose(state, self.cache.einsum_order)
-        state = K.reshape(state, self.cache.einsum_shape)
-        return K.einsum("abac->bc", state)
+        rho = K.einsum(self.cache.einsum_string, state)
+        return K.reshape(rho, self.cache.reduced_shape)
 
     def _state_vector_call(self, state):
         raise_error(RuntimeError, "Partial trace gate cannot be used on state "
@@ -894,6 +924,61 @@ class KrausChannel(BackendGate, abstract_gates.KrausChannel):
     def __init__(self, ops):
         BackendGate.__init__(self)
         abstract_gates.KrausChannel.__init__(self, ops)
+        self._superop = None
+        self._kraus_matrices = None
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            cache = K.create_gate_cache(self)
+            if not K.is_custom:
+                targets = self.target_qubits + tuple(
+                    q + self.nqubits for q in self.target_qubits)
+                cache.superop_cache = K.create_einsum_cache(
+                    targets, 2 * self.nqubits)
+            self._cache = cache
+        return self._cache
+
+    def _lift_matrix(self, gate):
+        """Returns the matrix of ``gate`` acting on all channel target qubits."""
+        return self._expand_matrix(K.to_numpy(self._full_matrix(gate)),
+                                   gate.target_qubits, self.target_qubits)
+
+    @property
+    def superop(self):
+        """Superoperator :math:`\\sum_k A_k \\otimes A_k^*` of the channel.
+
+        Acts on the row and column legs of the channel's target qubits so that
+        the channel is applied to density matrices using a single matrix
+        multiplication instead of one update per Kraus operator.
+        """
+        if self._superop is None or self._superop.dtype != K.dtypes('DTYPECPX'):
+            superop = 0
+            for gate in self.gates:
+                matrix = self._lift_matrix(gate)
+                superop = superop + K.qnp.kron(matrix, K.qnp.conj(matrix))
+            self._superop = K.cast(superop)
+        return self._superop
+
+    @property
+    def kraus_matrices(self):
+        """Stacked Kraus operators lifted to the channel target qubits.
+
+        Returns a tuple with the operators :math:`A_k` stacked to a
+        ``(nops * d, d)`` matrix and their conjugates :math:`A^*_k` stacked
+        to a ``(nops * d, d)`` matrix with the column index first,
+        where ``d`` is the dimension of the target qubits.
+        """
+        if (self._kraus_matrices is None or
+                self._kraus_matrices[0].dtype != K.dtypes('DTYPECPX')):
+            matrices = K.qnp.stack([self._lift_matrix(gate)
+                                    for gate in self.gates])
+            nops, d, _ = matrices.shape
+            left = K.qnp.reshape(matrices, (nops * d, d))
+            right = K.qnp.transpose(K.qnp.conj(matrices), [0, 2, 1])
+            right = K.qnp.reshape(right, (nops * d, d))
+            self._kraus_matrices = (K.cast(left), K.cast(right))
+        return self._kraus_matrices
 
     def calculate_inverse_gates(self):
         inv_gates = []
@@ -912,7 +997,38 @@ class KrausChannel(BackendGate, abstract_gates.KrausChannel):
         raise_error(ValueError, "`KrausChannel` cannot be applied to state "
                                 "vectors. Please switch to density matrices.")
 
+    def _batched_call(self, state):
+        """Applies all Kraus operators to a density matrix using two matmuls.
+
+        The first multiplication calculates :math:`A_k \\rho` for all
+        operators at once and the second contracts the result with
+        :math:`A^\\dagger_k` summing over the operators.
+        """
+        left, right = self.kraus_matrices
+        d = int(left.shape[1])
+        nops = int(left.shape[0]) // d
+        forward, reverse = self.cache.superop_cache.vector
+        state = K.transpose(K.reshape(state, self.cache.tensor_shape), forward)
+        shape = tuple(state.shape)
+        # (k * i, l * x) with row legs ``i``, column legs ``l`` of the
+        # targets and ``x`` the remaining legs
+        state = K.matmul(left, K.reshape(state, (d, -1)))
+        state = K.reshape(state, (nops, d, d, -1))
+        state = K.reshape(K.transpose(state, [1, 3, 0, 2]), (-1, nops * d))
+        state = K.reshape(K.matmul(state, right), (d, -1, d))
+        state = K.reshape(K.transpose(state, [0, 2, 1]), shape)
+        state = K.transpose(state, reverse)
+        return K.reshape(state, self.cache.flat_shape)
+
     def _density_matrix_call(self, state):
+        if not K.is_custom:
+            if len(self.target_qubits) > 2:
+                return self._batched_call(state)
+            state = K.reshape(state, self.cache.tensor_shape)
+            state = K.matmul_call(self.cache.superop_cache.vector, state,
+                                  self.superop)
+            return K.reshape(state, self.cache.flat_shape)
+
         new_state = K.zeros_like(state)
         for gate, inv_gate in zip(self.gates, self.inverse_gates):
             new_state += gate(state)
@@ -963,11 +1079,37 @@ class PauliNoiseChannel(UnitaryChannel, abstract_gates.PauliNoiseChannel):
                  seed: Optional[int] = None):
         BackendGate.__init__(self)
         abstract_gates.PauliNoiseChannel.__init__(self, q, px, py, pz, seed=seed)
+        self._masks = None
         self.set_seed()
 
     def calculate_inverse_gates(self):
         return tuple(self.gates[:-1]) + (None,)
 
+    @property
+    def masks(self):
+        """:class:`qibo.core.gates.PauliMask` gates used for the density matrix branches.
+
+        In density matrix mode each mask updates the row and column legs of
+        the target qubit together, so each Pauli branch requires a single
+        pass over the density matrix and no inverse gate.
+        """
+        if self._masks is None:
+            self._masks = []
+            for gate in self.gates:
+                mask = getattr(self.module, "{}Mask".format(gate.name.upper()))
+                self._masks.append(mask(*gate.target_qubits))
+                self._masks[-1].nqubits = self.nqubits
+                self._masks[-1].density_matrix = True
+        return self._masks
+
+    def _density_matrix_call(self, state):
+        if K.is_custom:
+            return UnitaryChannel._density_matrix_call(self, state)
+        new_state = (1 - self.psum) * state
+        for p, mask in zip(self.probs, self.masks):
+            new_state += p * mask(state)
+        return new_state
+
 
 class ResetChannel(UnitaryChannel, abstract_gates.ResetChannel):
 
@@ -1112,6 +1254,60 @@ class FusedGate(MatrixGate, abstract_gates.FusedGate):
         if K.is_custom and len(self.target_qubits) > 2:
             # Custom kernels currently support up to two target qubits
             raise_error(NotImplementedError, "Fused gates can target up to two qubits.")
+        self._reset_products()
+
+    def _reset_products(self):
+        """Resets the cached matrices used by ``_construct_unitary``.
+
+        ``self._components[i]`` holds the matrix of ``self.gates[i]`` lifted
+        to the ``FusedGate`` target qubits and ``self._sources[i]`` the gate
+        matrix object that it was calculated from. ``self._left[i]`` is the
+        product of the first ``i`` components and ``self._right[i]`` the
+        product of the components from ``i`` to the end. ``None`` marks
+        products that need to be recalculated and components that are equal
+        to the identity, which are skipped in the products.
+        """
+        n = len(self.gates)
+        identity = K.qnp.eye(2 ** len(self.target_qubits))
+        self._identity = identity
+        self._sources = n * [None]
+        self._components = n * [None]
+        self._left = [identity] + n * [None]
+        self._right = n * [None] + [identity]
+
+    def _lift_matrix(self, matrix, gate):
+        """Returns ``matrix`` of ``gate`` acting on the ``FusedGate`` targets."""
+        # transfer gate matrix to numpy as it is more efficient for
+        # small tensor calculations
+        return self._expand_matrix(K.to_numpy(matrix), gate.qubits,
+                                   self.target_qubits)
+
+    def _is_identity(self, matrix):
+        return K.qnp.np.allclose(matrix, self._identity, rtol=0, atol=1e-14)
+
+    def _left_product(self, i):
+        k = i
+        while self._left[k] is None:
+            k -= 1
+        for k in range(k, i):
+            component = self._components[k]
+            if component is None:
+                self._left[k + 1] = self._left[k]
+            else:
+                self._left[k + 1] = component @ self._left[k]
+        return self._left[i]
+
+    def _right_product(self, i):
+        k = i
+        while self._right[k] is None:
+            k += 1
+        for k in range(k - 1, i - 1, -1):
+            component = self._components[k]
+            if component is None:
+                self._right[k] = self._right[k + 1]
+            else:
+                self._right[k] = self._right[k + 1] @ component
+        return self._right[i]
 
     def _construct_unitary(self):
         """Constructs a single unitary by multiplying the matrices of the gates that are fused.
@@ -1119,31 +1315,132 @@ class FusedGate(MatrixGate, abstract_gates.FusedGate):
         This matrix is used to perform a single update in the state during
         simulation instead of applying the fused gates one by one.
 
-        Note that this method assumes maximum two target qubits and should be
-        updated if the fusion algorithm is extended to gates of higher rank.
+        The lifted matrices of the fused gates and partial products of them
+        are cached, so that when the parameters of some gates are updated
+        (for example using ``circuit.set_parameters``) only the smallest
+        contiguous range of gates that contains all updated gates is
+        multiplied again. Components that are equal to the identity, for
+        example rotations with zero angle, are skipped.
         """
-        matrix = K.qnp.eye(2 ** len(self.target_qubits))
-        for gate in self.gates:
-            # transfer gate matrix to numpy as it is more efficient for
-            # small tensor calculations
-            gmatrix = K.to_numpy(gate.matrix)
-            if len(gate.qubits) < len(self.target_qubits):
-                # fuse one-qubit gate (2x2 matrix) to a two-qubit ``FusedGate``
-                # Kronecker product with identity is needed to make the
-                # original matrix 4x4.
-                if gate.qubits[0] == self.target_qubits[0]:
-                    # gate target qubit is the first ```FusedGate`` target
-                    gmatrix = K.qnp.kron(gmatrix, K.qnp.eye(2))
-                else:
-                    # gate target qubit is the second ``FusedGate`` target
-                    gmatrix = K.qnp.kron(K.qnp.eye(2), gmatrix)
-            elif gate.qubits != self.target_qubits:
-                # fuse two-qubit gate (4x4 matrix) for which the target qubits
-                # are in opposite order compared to the ``FusedGate`` and
-                # the corresponding matrix has to be transposed before fusion
-                gmatrix = K.qnp.reshape(gmatrix, 4 * (2,))
-                gmatrix = K.qnp.transpose(gmatrix, [1, 0, 3, 2])
-                gmatrix = K.qnp.reshape(gmatrix, (4, 4))
-            # fuse the individual gate matrix to the total ``FusedGate`` matrix
-            matrix = gmatrix @ matrix
+        n = len(self.gates)
+        if len(self._components) != n:
+            # new gates were added so the cached products are invalid
+            self._reset_products()
+
+        changed = []
+        for i, gate in enumerate(self.gates):
+            matrix = self._full_matrix(gate)
+            if matrix is not self._sources[i]:
+                self._sources[i] = matrix
+                component = self._lift_matrix(matrix, gate)
+                if self._is_identity(component):
+                    component = None
+                self._components[i] = component
+                changed.append(i)
+
+        if changed:
+            i, j = changed[0], changed[-1] + 1
+            # invalidate partial products that contain updated components
+            self._left[i + 1:] = (n - i) * [None]
+            self._right[:j] = j * [None]
+        else:
+            i, j = n, n
+
+        matrix = self._left_product(i)
+        for component in self._components[i:j]:
+            if component is not None:
+                matrix = component @ matrix
+        matrix = self._right_product(j) @ matrix
         return K.cast(matrix)
+
+
+class PauliMask(BackendGate, abstract_gates.PauliMask):
+
+    def __init__(self, *q):
+        BackendGate.__init__(self)
+        abstract_gates.PauliMask.__init__(self, *q)
+        self._gates = None
+        self._signs = None
+
+    class GateCache:
+        pass
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            cache = self.GateCache()
+            s = 1 + self.density_matrix
+            cache.tensor_shape = K.cast(s * self.nqubits * (2,), dtype='DTYPEINT')
+            cache.flat_shape = K.cast(s * (2 ** self.nqubits,), dtype='DTYPEINT')
+            axes = tuple(self.target_qubits)
+            if self.density_matrix:
+                axes += tuple(q + self.nqubits for q in self.target_qubits)
+            cache.axes = axes
+            self._cache = cache
+        return self._cache
+
+    @property
+    def signs(self):
+        """(-1) ** (sum of target bits) as a tensor that broadcasts to the state shape.
+
+        Includes the phase of ``Y`` gates and is rebuilt when the precision
+        changes.
+        """
+        if self._signs is None or self._signs.dtype != K.dtypes('DTYPECPX'):
+            ndim = len(self.cache.tensor_shape)
+            signs = K.np.ones(ndim * (1,))
+            for axis in self.cache.axes:
+                shape = [1] * ndim
+                shape[axis] = 2
+                signs = signs * K.np.reshape([1, -1], shape)
+            if self.pauli == "Y" and not self.density_matrix:
+                # for density matrices the phases of Y and Y^* cancel
+                signs = signs * (-1j) ** len(self.target_qubits)
+            self._signs = K.cast(signs)
+        return self._signs
+
+    @property
+    def gates(self):
+        """Individual Pauli gates that are equivalent to the mask."""
+        if self._gates is None:
+            self._gates = [getattr(self.module, self.pauli)(q)
+                           for q in self.target_qubits]
+            for gate in self._gates:
+                gate.nqubits = self.nqubits
+                gate.density_matrix = self.density_matrix
+        return self._gates
+
+    def _construct_unitary(self):
+        pauli = getattr(K.matrices, self.pauli)
+        matrix = pauli
+        for _ in range(len(self.target_qubits) - 1):
+            matrix = K.kron(matrix, pauli)
+        return matrix
+
+    def _state_vector_call(self, state):
+        if K.is_custom:
+            for gate in self.gates:
+                state = gate(state)
+            return state
+        # flip and/or change sign of all target qubits in a single update
+        state = K.reshape(state, self.cache.tensor_shape)
+        if self.pauli != "Z":
+            state = K.flip(state, self.cache.axes)
+        if self.pauli != "X":
+            state = self.signs * state
+        return K.reshape(state, self.cache.flat_shape)
+
+    def _density_matrix_call(self, state):
+        return self._state_vector_call(state)
+
+
+class XMask(PauliMask, abstract_gates.XMask):
+    pass
+
+
+class YMask(PauliMask, abstract_gates.YMask):
+    pass
+
+
+class ZMask(PauliMask, abstract_gates.ZMask):
+    pass
@@ -88,7 +88,7 @@ class StateEvolution:
     def _create_calculate_callbacks(self, accelerators):
         def calculate_callbacks(state):
             for callback in self.callbacks:
-                callback.append(callback(state))
+                callback.record(state)
 
         if accelerators is None:
             return calculate_callbacks
@@ -98,7 +98,10 @@ class StateEvolution:
                 if not isinstance(state, K.tensor_types):
                     state = state.tensor
             with K.on_cpu():
-                calculate_callbacks(state)
+                # evaluate callbacks immediately instead of recording them,
+                # so that all their calculations run on CPU
+                for callback in self.callbacks:
+                    callback.append(callback(state))
 
         return calculate_callbacks_distributed
 
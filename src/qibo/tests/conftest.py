@@ -46,6 +46,24 @@ def pytest_addoption(parser):
     # parallel tests make the CI hang
 
 
+@pytest.fixture(scope="module")
+def random_rho():
+    """Random density matrices of one to four qubits shared by a test module.
+
+    Tests should copy the matrices before passing them to methods that may
+    modify them in-place.
+    """
+    from qibo.tests.utils import random_density_matrix
+    return {n: random_density_matrix(n) for n in range(1, 5)}
+
+
+def _switch_backend(backend_name, platform_name=None):
+    """Sets the backend only if it is different from the active one."""
+    if (backend_name != qibo.get_backend() or
+        platform_name not in (None, K.get_platform())):
+        qibo.set_backend(backend_name, platform=platform_name)
+
+
 @pytest.fixture
 def backend(backend_platform):
     if "-" in backend_platform:
@@ -55,9 +73,35 @@ def backend(backend_platform):
 
     original_backend = qibo.get_backend()
     original_platform = K.get_platform()
-    qibo.set_backend(backend_name, platform=platform_name)
+    _switch_backend(backend_name, platform_name)
     yield
-    qibo.set_backend(original_backend, platform=original_platform)
+    _switch_backend(original_backend, original_platform)
+
+
+@pytest.fixture
+def switch_backend():
+    """Function that switches the backend within a test.
+
+    Used by tests that require a specific backend. The original backend is
+    restored when the test finishes, even if it fails.
+    """
+    original_backend = qibo.get_backend()
+    original_platform = K.get_platform()
+    yield _switch_backend
+    _switch_backend(original_backend, original_platform)
+
+
+@pytest.fixture(params=["double", "single"])
+def precision(backend, request):
+    """Runs a test in single and double precision.
+
+    Tests using this fixture should adapt their tolerance to the precision,
+    as single precision agrees with double up to ``1e-6``.
+    """
+    original_precision = qibo.get_precision()
+    qibo.set_precision(request.param)
+    yield request.param
+    qibo.set_precision(original_precision)
 
 
 def pytest_generate_tests(metafunc):
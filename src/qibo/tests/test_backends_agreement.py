@@ -34,6 +34,7 @@ METHODS = [
     ("einsum", ["xy,axby->ab", rand((2, 2)), rand(4 * (2,))]),
     ("tensordot", [rand((2, 2)), rand(4 * (2,)), [[0, 1], [1, 3]]]),
     ("transpose", [rand((3, 3, 3)), [0, 2, 1]]),
+    ("flip", [rand((2, 3, 4)), (0, 2)]),
     ("gather_nd", [rand((5, 3)), [0, 1]]),
     ("expm", [rand((4, 4))]),
     ("mod", [np.random.randint(10), np.random.randint(2, 10)]),
@@ -4,6 +4,7 @@ import numpy as np
 from qibo.models import Circuit, AdiabaticEvolution
 from qibo import gates, callbacks, K
 from qibo.config import EIGVAL_CUTOFF
+from qibo.tests.utils import random_state
 
 
 # Absolute testing tolerance for the cases of zero entanglement entropy
@@ -118,6 +119,42 @@ def test_entropy_in_circuit(backend, density_matrix):
     K.assert_allclose(entropy_spectrum, target_spectrum, atol=_atol)
 
 
+@pytest.mark.parametrize("nqubits", [4, 6])
+def test_entropy_record(backend, nqubits):
+    """Check that recorded entropies agree with entropies calculated per call."""
+    partition = list(range(nqubits // 2))
+    entropy = callbacks.EntanglementEntropy(partition, compute_spectrum=True)
+    target_entropy = callbacks.EntanglementEntropy(partition, compute_spectrum=True)
+    # keep track of the number of matrices diagonalized in each call
+    batches = []
+    entropy_func = entropy.entropy
+    def entropy_spy(rho):
+        batches.append(1 if len(tuple(rho.shape)) == 2 else int(rho.shape[0]))
+        return entropy_func(rho)
+    entropy.entropy = entropy_spy
+
+    nstates = 2 * entropy.buffer_size + 3
+    states = [K.cast(random_state(nqubits)) for _ in range(nstates)]
+    for state in states[:-2]:
+        entropy.record(state)
+    entropy.append(entropy(states[-2]))
+    entropy.record(states[-1])
+    for state in states:
+        target_entropy.append(target_entropy(state))
+    K.assert_allclose(entropy[:], target_entropy[:])
+    assert len(entropy.spectrum) == nstates
+    for spectrum, target_spectrum in zip(entropy.spectrum, target_entropy.spectrum):
+        K.assert_allclose(spectrum, target_spectrum)
+
+    assert sum(batches) == nstates
+    assert max(batches) <= entropy.buffer_size
+    if 2 ** (nqubits // 2) > entropy.buffer_max_dim:
+        # large reduced density matrices are not buffered
+        assert batches == nstates * [1]
+    else:
+        assert batches[:2] == 2 * [entropy.buffer_size]
+
+
 @pytest.mark.parametrize("gateconf,target_entropy",
                          [(["H", "CNOT", "entropy"], [1.0]),
                           (["H", "entropy", "CNOT"], [0.0]),
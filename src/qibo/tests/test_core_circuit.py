@@ -3,6 +3,12 @@ import numpy as np
 import pytest
 from qibo import gates, K
 from qibo.models import Circuit
+from qibo.tests.utils import apply_local
+
+# target matrices shared by all backend parametrizations
+H = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+H2 = np.kron(H, H)
+CNOT = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
 
 
 def test_circuit_init(backend, accelerators):
@@ -40,6 +46,27 @@ def test_eager_execute(backend, accelerators):
     K.assert_allclose(c(), target_state)
 
 
+@pytest.mark.parametrize("density_matrix", [False, True])
+def test_circuit_reexecution(backend, density_matrix):
+    """Check that executing a circuit again gives the same final state."""
+    c = Circuit(3, density_matrix=density_matrix)
+    c.add((gates.H(i) for i in range(3)))
+    c.add(gates.CNOT(0, 2))
+    final_state = K.copy(c().tensor)
+    K.assert_allclose(c(), final_state)
+
+
+@pytest.mark.parametrize("density_matrix", [False, True])
+def test_circuit_pickle(backend, density_matrix):
+    """Check that a circuit can be pickled after it is executed."""
+    import pickle
+    c = Circuit(3, density_matrix=density_matrix)
+    c.add([gates.H(0), gates.CNOT(0, 2), gates.CZ(2, 1)])
+    final_state = K.copy(c().tensor)
+    new_c = pickle.loads(pickle.dumps(c))
+    K.assert_allclose(new_c(), final_state)
+
+
 def test_compiled_execute(backend):
     def create_circuit(theta = 0.1234):
         c = Circuit(2)
@@ -140,15 +167,11 @@ def test_density_matrix_circuit(backend):
     c.add(gates.H(2))
     final_rho = c(np.copy(initial_rho))
 
-    h = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
-    cnot = np.array([[1, 0, 0, 0], [0, 1, 0, 0],
-                     [0, 0, 0, 1], [0, 0, 1, 0]])
-    m1 = np.kron(np.kron(h, h), np.eye(2))
-    m2 = np.kron(cnot, np.eye(2))
-    m3 = np.kron(np.eye(4), h)
-    target_rho = m1.dot(initial_rho).dot(m1.T.conj())
-    target_rho = m2.dot(target_rho).dot(m2.T.conj())
-    target_rho = m3.dot(target_rho).dot(m3.T.conj())
+    target_rho = np.copy(initial_rho)
+    for matrix, qubits in [(H2, (0, 1)), (CNOT, (0, 1)), (H, (2,))]:
+        target_rho = apply_local(target_rho, matrix, qubits, 3)
+        target_rho = apply_local(target_rho, matrix.T.conj(), qubits, 3,
+                                 side="right")
     K.assert_allclose(final_rho, target_rho)
 
 
@@ -3,27 +3,30 @@ import numpy as np
 import pytest
 import qibo
 from qibo import K, gates
+from qibo import matrices
 from qibo.models import Circuit
 
+# two-qubit Pauli products shared by all backend parametrizations
+XI = np.kron(matrices.X, matrices.I)
+ZI = np.kron(matrices.Z, matrices.I)
+IY = np.kron(matrices.I, matrices.Y)
+IZ = np.kron(matrices.I, matrices.Z)
 
-def test_pauli_noise_channel(backend):
-    from qibo import matrices
+
+def test_pauli_noise_channel(backend, precision):
     c = Circuit(2, density_matrix=True)
     c.add(gates.H(0))
     c.add(gates.H(1))
     c.add(gates.PauliNoiseChannel(0, px=0.5, pz=0.3))
     c.add(gates.PauliNoiseChannel(1, py=0.1, pz=0.3))
-    final_rho = c().numpy()
+    final_rho = c()
 
     psi = np.ones(4) / 2
     rho = np.outer(psi, psi.conj())
-    m1 = np.kron(matrices.X, matrices.I)
-    m2 = np.kron(matrices.Z, matrices.I)
-    rho = 0.2 * rho + 0.5 * m1.dot(rho.dot(m1)) + 0.3 * m2.dot(rho.dot(m2))
-    m1 = np.kron(matrices.I, matrices.Y)
-    m2 = np.kron(matrices.I, matrices.Z)
-    rho = 0.6 * rho + 0.1 * m1.dot(rho.dot(m1)) + 0.3 * m2.dot(rho.dot(m2))
-    K.assert_allclose(final_rho, rho)
+    rho = 0.2 * rho + 0.5 * XI.dot(rho.dot(XI)) + 0.3 * ZI.dot(rho.dot(ZI))
+    rho = 0.6 * rho + 0.1 * IY.dot(rho.dot(IY)) + 0.3 * IZ.dot(rho.dot(IZ))
+    tol = {"rtol": 1e-5, "atol": 1e-6} if precision == "single" else {}
+    K.assert_allclose(final_rho, K.cast(rho), **tol)
 
 
 def test_noisy_circuit_reexecution(backend):
@@ -115,13 +118,12 @@ def test_circuit_with_noise_errors():
         noisy_c = c.with_noise({0, 1})
 
 
-def test_density_matrix_circuit_measurement(backend):
+def test_density_matrix_circuit_measurement(backend, precision):
     """Check measurement gate on density matrices using circuit."""
     from qibo.tests.test_measurement_gate import assert_result
     from qibo.tests.test_measurement_gate_registers import assert_register_result
-    state = np.zeros(16)
-    state[0] = 1
-    init_rho = np.outer(state, state.conj())
+    init_rho = np.zeros((16, 16))
+    init_rho[0, 0] = 1
 
     c = Circuit(4, density_matrix=True)
     c.add(gates.X(1))
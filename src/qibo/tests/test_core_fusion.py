@@ -3,6 +3,13 @@ import numpy as np
 import pytest
 from qibo import gates, K
 from qibo.models import Circuit
+from qibo.tests.utils import random_state
+
+# target matrices shared by all backend parametrizations
+X = np.array([[0, 1], [1, 0]])
+H = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+CNOT = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
+TARGET_HCX = np.kron(X, X) @ CNOT @ np.kron(H, H)
 
 
 def test_single_fusion_gate():
@@ -44,12 +51,7 @@ def test_fusedgate_matrix_calculation(backend):
     assert len(circuit.queue) == 1
     fused_gate = circuit.queue[0]
 
-    x = np.array([[0, 1], [1, 0]])
-    h = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
-    cnot = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1],
-                     [0, 0, 1, 0]])
-    target_matrix = np.kron(x, x) @ cnot @ np.kron(h, h)
-    K.assert_allclose(fused_gate.matrix, target_matrix)
+    K.assert_allclose(fused_gate.matrix, TARGET_HCX)
 
 
 def test_fuse_circuit_two_qubit_gates(backend):
@@ -61,6 +63,7 @@ def test_fuse_circuit_two_qubit_gates(backend):
     c.add(gates.fSim(1, 0, theta=0.1234, phi=0.324))
     c.add(gates.RY(1, theta=0.1234).controlled_by(0))
     fused_c = c.fuse()
+    assert len(fused_c.queue) == 1
     K.assert_allclose(fused_c(), c())
 
 
@@ -83,14 +86,13 @@ def test_fuse_circuit_three_qubit_gate(backend):
 @pytest.mark.parametrize("nlayers", [1, 2])
 def test_variational_layer_fusion(backend, nqubits, nlayers):
     """Check fused variational layer execution."""
-    theta = 2 * np.pi * np.random.random((2 * nlayers * nqubits,))
-    theta_iter = iter(theta)
+    theta = 2 * np.pi * np.random.random((nlayers, 2, nqubits))
 
     c = Circuit(nqubits)
-    for _ in range(nlayers):
-        c.add((gates.RY(i, next(theta_iter)) for i in range(nqubits)))
+    for theta1, theta2 in theta:
+        c.add((gates.RY(i, t) for i, t in enumerate(theta1)))
         c.add((gates.CZ(i, i + 1) for i in range(0, nqubits - 1, 2)))
-        c.add((gates.RY(i, next(theta_iter)) for i in range(nqubits)))
+        c.add((gates.RY(i, t) for i, t in enumerate(theta2)))
         c.add((gates.CZ(i, i + 1) for i in range(1, nqubits - 1, 2)))
         c.add(gates.CZ(0, nqubits - 1))
 
@@ -98,6 +100,37 @@ def test_variational_layer_fusion(backend, nqubits, nlayers):
     K.assert_allclose(fused_c(), c())
 
 
+@pytest.mark.parametrize("nqubits", [4, 5])
+@pytest.mark.parametrize("nlayers", [1, 2])
+@pytest.mark.parametrize("max_qubits", [2, None])
+def test_variational_layer_fusion_layer_mode(backend, nqubits, nlayers, max_qubits):
+    """Check fusion of variational circuit layers to a single gate per layer."""
+    theta = 2 * np.pi * np.random.random((nlayers, 2, nqubits))
+    c = Circuit(nqubits)
+    for theta1, theta2 in theta:
+        c.add((gates.RY(i, t) for i, t in enumerate(theta1)))
+        c.add((gates.CZ(i, i + 1) for i in range(0, nqubits - 1, 2)))
+        c.add((gates.RY(i, t) for i, t in enumerate(theta2)))
+        c.add((gates.CZ(i, i + 1) for i in range(1, nqubits - 1, 2)))
+        c.add(gates.CZ(0, nqubits - 1))
+
+    if max_qubits is None:
+        max_qubits = nqubits
+    fused_c = c.fuse(max_qubits=max_qubits, mode="layer")
+    assert max(len(gate.qubits) for gate in fused_c.queue) <= max_qubits
+    if max_qubits == nqubits:
+        # the first layer of RY gates is fused to a single gate
+        assert fused_c.queue[0].qubits == tuple(range(nqubits))
+        assert len(fused_c.queue) <= 5 * nlayers
+    K.assert_allclose(fused_c(), c())
+
+    # fused gates are reused when the parameters are updated
+    params = 2 * np.pi * np.random.random(2 * nlayers * nqubits)
+    c.set_parameters(params)
+    fused_c.set_parameters(params)
+    K.assert_allclose(fused_c(), c())
+
+
 @pytest.mark.parametrize("nqubits", [4, 5])
 @pytest.mark.parametrize("ngates", [10, 20])
 def test_random_circuit_fusion(backend, nqubits, ngates):
@@ -105,20 +138,95 @@ def test_random_circuit_fusion(backend, nqubits, ngates):
     one_qubit_gates = [gates.RX, gates.RY, gates.RZ]
     two_qubit_gates = [gates.CNOT, gates.CZ, gates.SWAP]
     thetas = np.pi * np.random.random((ngates,))
+    gate_idx1 = np.random.randint(0, 3, ngates)
+    gate_idx2 = np.random.randint(0, 3, ngates)
+    targets = np.random.randint(0, nqubits, ngates)
+    q0s = np.random.randint(0, nqubits, ngates)
+    q1s = np.random.randint(0, nqubits, ngates)
+    mask = q0s == q1s
+    while mask.any():
+        q1s[mask] = np.random.randint(0, nqubits, mask.sum())
+        mask = q0s == q1s
+
     c = Circuit(nqubits)
-    for i in range(ngates):
-        gate = one_qubit_gates[int(np.random.randint(0, 3))]
-        q0 = np.random.randint(0, nqubits)
-        c.add(gate(q0, thetas[i]))
-        gate = two_qubit_gates[int(np.random.randint(0, 3))]
-        q0, q1 = np.random.randint(0, nqubits, (2,))
-        while q0 == q1:
-            q0, q1 = np.random.randint(0, nqubits, (2,))
-        c.add(gate(q0, q1))
+    for g1, g2, t, q0, q1, theta in zip(gate_idx1.tolist(), gate_idx2.tolist(),
+                                        targets.tolist(), q0s.tolist(),
+                                        q1s.tolist(), thetas):
+        c.add(one_qubit_gates[g1](t, theta))
+        c.add(two_qubit_gates[g2](q0, q1))
     fused_c = c.fuse()
     K.assert_allclose(fused_c(), c(), atol=1e-7)
 
 
+def test_fusion_reuses_earlier_group():
+    """Check that gates are fused to an earlier group if they commute with later groups."""
+    queue = [gates.H(0), gates.H(1), gates.CZ(0, 1), gates.CNOT(1, 2),
+             gates.X(0), gates.H(2)]
+    c = Circuit(3)
+    c.add(queue)
+    fused_c = c.fuse()
+    assert len(fused_c.queue) == 2
+    gate1, gate2 = fused_c.queue
+    assert gate1.target_qubits == (0, 1)
+    assert gate1.gates == [queue[0], queue[1], queue[2], queue[4]]
+    assert gate2.target_qubits == (1, 2)
+    assert gate2.gates == [queue[3], queue[5]]
+
+
+def test_one_qubit_gate_absorption(backend):
+    """Check that one-qubit gates are absorbed in neighboring two-qubit groups."""
+    queue = [gates.TOFFOLI(0, 1, 2), gates.RX(0, theta=0.1),
+             gates.RY(2, theta=0.2), gates.CZ(1, 2), gates.RZ(1, theta=0.3),
+             gates.CNOT(0, 3), gates.H(2), gates.H(3)]
+    c = Circuit(4)
+    c.add(queue)
+    fused_c = c.fuse()
+    assert len(fused_c.queue) == 3
+    toffoli, gate1, gate2 = fused_c.queue
+    assert toffoli is queue[0]
+    # ``RX(0)`` is absorbed forward in the ``CNOT(0, 3)`` group
+    # and ``H(2)`` backward in the ``CZ(1, 2)`` group
+    assert gate1.gates == [queue[1], queue[5], queue[7]]
+    assert gate2.gates == [queue[2], queue[3], queue[4], queue[6]]
+    K.assert_allclose(fused_c(), c())
+
+
+@pytest.mark.parametrize("nqubits", [4, 5])
+@pytest.mark.parametrize("max_qubits", [1, 3, 4])
+def test_random_circuit_fusion_max_qubits(backend, nqubits, max_qubits):
+    """Check gate fusion to different maximum number of qubits."""
+    ngates = 20
+    one_qubit_gates = [gates.RX, gates.RY, gates.RZ]
+    two_qubit_gates = [gates.CNOT, gates.CZ, gates.SWAP]
+    thetas = np.pi * np.random.random((ngates,))
+    targets = np.random.randint(0, nqubits, ngates)
+    qubit_pairs = [np.random.choice(nqubits, 2, replace=False).tolist()
+                   for _ in range(ngates)]
+    c = Circuit(nqubits)
+    for i, (t, (q0, q1)) in enumerate(zip(targets.tolist(), qubit_pairs)):
+        c.add(one_qubit_gates[i % 3](t, thetas[i]))
+        c.add(two_qubit_gates[i % 3](q0, q1))
+    c.add(gates.TOFFOLI(0, 1, 2))
+    if K.is_custom and max_qubits > 2:
+        with pytest.raises(NotImplementedError):
+            fused_c = c.fuse(max_qubits=max_qubits)
+    else:
+        fused_c = c.fuse(max_qubits=max_qubits)
+        for gate in fused_c.queue:
+            if isinstance(gate, gates.FusedGate):
+                assert len(gate.target_qubits) <= max_qubits
+        K.assert_allclose(fused_c(), c(), atol=1e-7)
+
+
+def test_fusion_max_qubits_error():
+    c = Circuit(2)
+    c.add([gates.H(0), gates.CNOT(0, 1)])
+    with pytest.raises(ValueError):
+        fused_c = c.fuse(max_qubits=0)
+    with pytest.raises(ValueError):
+        fused_c = c.fuse(mode="test")
+
+
 def test_controlled_by_gates_fusion(backend):
     """Check circuit fusion that contains ``controlled_by`` gates."""
     c = Circuit(4)
@@ -129,9 +237,40 @@ def test_controlled_by_gates_fusion(backend):
     c.add(gates.RX(1, theta=0.1234).controlled_by(0))
     c.add(gates.RX(3, theta=0.4321).controlled_by(2))
     fused_c = c.fuse()
+    assert len(fused_c.queue) == 2
     K.assert_allclose(fused_c(), c())
 
 
+@pytest.mark.parametrize("pauli", ["X", "Y", "Z"])
+@pytest.mark.parametrize("density_matrix", [False, True])
+def test_pauli_mask_fusion(backend, pauli, density_matrix):
+    """Check that adjacent unfused Pauli gates are merged to a ``PauliMask``."""
+    c = Circuit(4, density_matrix=density_matrix)
+    c.add((getattr(gates, pauli)(q) for q in range(3)))
+    c.add(gates.TOFFOLI(0, 1, 2))
+    c.add(getattr(gates, pauli)(3))
+    fused_c = c.fuse()
+    assert len(fused_c.queue) == 3
+    mask = fused_c.queue[0]
+    assert isinstance(mask, getattr(gates, f"{pauli}Mask"))
+    assert mask.target_qubits == (0, 1, 2)
+    assert isinstance(fused_c.queue[2], getattr(gates, pauli))
+    K.assert_allclose(fused_c(), c())
+    # masks are drawn and exported as the individual Pauli gates
+    assert fused_c.draw() == c.draw()
+    assert fused_c.to_qasm() == c.to_qasm()
+    # final states of repeated executions do not share memory
+    c = Circuit(3, density_matrix=density_matrix)
+    c.add([getattr(gates, pauli)(0), getattr(gates, pauli)(1)])
+    fused_c = c.fuse()
+    state1 = fused_c().tensor
+    state2 = fused_c().tensor
+    assert state1 is not state2
+    if isinstance(state1, np.ndarray):
+        assert not np.shares_memory(state1, state2)
+    K.assert_allclose(state1, state2)
+
+
 def test_callbacks_fusion(backend):
     """Check entropy calculation in fused circuit."""
     from qibo import callbacks
@@ -162,3 +301,43 @@ def test_set_parameters_fusion(backend):
     c.set_parameters(4 * [0.4321])
     fused_c.set_parameters(4 * [0.4321])
     K.assert_allclose(fused_c(), c())
+
+
+def test_set_parameters_fusion_partial_update(backend):
+    """Check fused gate matrix when only some of the fused gates are updated."""
+    c = Circuit(2)
+    c.add(gates.RX(0, theta=0.1234))
+    c.add(gates.RY(1, theta=0.2345))
+    c.add(gates.CNOT(0, 1))
+    c.add(gates.RZ(0, theta=0.3456))
+    c.add(gates.RY(1, theta=0.4567))
+    fused_c = c.fuse()
+    assert len(fused_c.queue) == 1
+    K.assert_allclose(fused_c(), c())
+
+    for gate in [c.queue[1], c.queue[3], c.queue[4], c.queue[0]]:
+        params = {gate: 0.5678}
+        c.set_parameters(params)
+        fused_c.set_parameters(params)
+        K.assert_allclose(fused_c(), c(), atol=1e-12)
+
+
+def test_fusion_identity_components(backend):
+    """Check fused gate matrix when some of the fused gates are identities."""
+    c = Circuit(2)
+    c.add(gates.RX(0, theta=0))
+    c.add(gates.I(1))
+    c.add(gates.CZ(0, 1))
+    c.add(gates.RY(1, theta=0))
+    fused_c = c.fuse()
+    assert len(fused_c.queue) == 1
+    K.assert_allclose(fused_c.queue[0].matrix, np.diag([1, 1, 1, -1]))
+    initial_state = random_state(2)
+    K.assert_allclose(fused_c(np.copy(initial_state)), c(np.copy(initial_state)))
+
+    # components that stop or start being identities after parameter updates
+    for params in [[0.1234, 0.4321], [0, 0.4321], [0, 0]]:
+        c.set_parameters(params)
+        fused_c.set_parameters(params)
+        K.assert_allclose(fused_c(np.copy(initial_state)),
+                          c(np.copy(initial_state)), atol=1e-12)
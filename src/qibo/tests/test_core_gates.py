@@ -3,7 +3,17 @@ import pytest
 import numpy as np
 from qibo import gates, K
 from qibo.config import raise_error
-from qibo.tests.utils import random_state, random_density_matrix
+from qibo.tests.utils import random_state, random_density_matrix, apply_local
+
+# target matrices shared by all backend parametrizations
+X = np.array([[0, 1], [1, 0]])
+Z = np.array([[1, 0], [0, -1]])
+H = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+CZ = np.diag([1, 1, 1, -1])
+CNOT = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
+TARGET_HCZ = CZ @ np.kron(H, H)
+TARGET_HCX4 = (np.kron(np.kron(X, X), np.kron(X, X)) @ np.kron(CNOT, CNOT) @
+               np.kron(np.kron(H, H), np.kron(H, H)))
 
 
 def apply_gates(gatelist, nqubits=None, initial_state=None):
@@ -316,6 +326,36 @@ def test_unitary(backend, nqubits):
     K.assert_allclose(final_state, target_state)
 
 
+@pytest.mark.parametrize("nqubits", [4, 14])
+@pytest.mark.parametrize("targets", [(0, 1), (1, 0), (0, 3), (3, 1), (2, 3)])
+def test_unitary_two_qubit_targets(backend, nqubits, targets):
+    """Check two-qubit matrices applied to every pair of target orderings."""
+    initial_state = random_state(nqubits)
+    matrix = np.random.random((4, 4)) + 1j * np.random.random((4, 4))
+    gate = gates.Unitary(matrix, *targets)
+    final_state = gate(K.cast(np.copy(initial_state)))
+    target_state = np.reshape(initial_state, nqubits * (2,))
+    target_state = np.tensordot(np.reshape(matrix, 4 * (2,)),
+                                np.moveaxis(target_state, targets, (0, 1)),
+                                axes=([2, 3], [0, 1]))
+    target_state = np.moveaxis(target_state, (0, 1), targets)
+    K.assert_allclose(final_state, target_state.ravel())
+
+
+@pytest.mark.parametrize("target", range(7))
+def test_unitary_one_qubit_targets(backend, target):
+    """Check one-qubit matrices applied to every qubit of a state vector."""
+    initial_state = random_state(7)
+    matrix = np.random.random((2, 2)) + 1j * np.random.random((2, 2))
+    gate = gates.Unitary(matrix, target)
+    final_state = gate(K.cast(np.copy(initial_state)))
+    target_state = np.reshape(initial_state, 7 * (2,))
+    target_state = np.tensordot(matrix, np.moveaxis(target_state, target, 0),
+                                axes=([1], [0]))
+    target_state = np.moveaxis(target_state, 0, target)
+    K.assert_allclose(final_state, target_state.ravel())
+
+
 def test_unitary_initialization(backend):
     matrix = np.random.random((4, 4))
     gate = gates.Unitary(matrix, 0, 1)
@@ -357,13 +397,7 @@ def test_unitary_multiqubit(backend):
     gatelist.append(gates.CNOT(2, 3))
     gatelist.extend(gates.X(i) for i in range(4))
 
-    h = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
-    x = np.array([[0, 1], [1, 0]])
-    cnot = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
-    matrix = np.kron(np.kron(x, x), np.kron(x, x))
-    matrix = matrix @ np.kron(cnot, cnot)
-    matrix = matrix @ np.kron(np.kron(h, h), np.kron(h, h))
-    unitary = gates.Unitary(matrix, 0, 1, 2, 3)
+    unitary = gates.Unitary(TARGET_HCX4, 0, 1, 2, 3)
     if K.name == "qibotf":
         with pytest.raises(NotImplementedError):
             final_state = apply_gates([unitary], nqubits=4)
@@ -415,7 +449,48 @@ def test_callback_gate_errors():
         gate._construct_unitary()
 
 
-def test_general_channel(backend):
+@pytest.mark.parametrize("pauli", ["X", "Y", "Z"])
+@pytest.mark.parametrize("density_matrix", [False, True])
+def test_pauli_mask(backend, pauli, density_matrix):
+    """Check that ``PauliMask`` is equivalent to applying individual Paulis."""
+    qubits = [0, 2, 3]
+    if density_matrix:
+        initial_state = random_density_matrix(4)
+    else:
+        initial_state = random_state(4)
+    mask = getattr(gates, f"{pauli}Mask")(*qubits)
+    mask.density_matrix = density_matrix
+    state = K.cast(np.copy(initial_state))
+    final_state = mask(state)
+    if isinstance(final_state, np.ndarray):
+        assert not np.shares_memory(final_state, state)
+    target_state = K.cast(np.copy(initial_state))
+    for q in qubits:
+        gate = getattr(gates, pauli)(q)
+        gate.density_matrix = density_matrix
+        target_state = gate(target_state)
+    K.assert_allclose(final_state, target_state)
+
+
+@pytest.mark.parametrize("pauli", ["Y", "Z"])
+def test_pauli_mask_precision_switch(backend, pauli):
+    """Check that ``PauliMask`` follows precision changes after it is used."""
+    import qibo
+    original_precision = qibo.get_precision()
+    initial_state = random_state(3)
+    mask = getattr(gates, f"{pauli}Mask")(0, 2)
+    for precision in ["double", "single"]:
+        qibo.set_precision(precision)
+        final_state = mask(K.cast(np.copy(initial_state)))
+        assert final_state.dtype == K.dtypes('DTYPECPX')
+        target_state = K.cast(np.copy(initial_state))
+        for q in [0, 2]:
+            target_state = getattr(gates, pauli)(q)(target_state)
+        K.assert_allclose(final_state, target_state, rtol=1e-5, atol=1e-6)
+    qibo.set_precision(original_precision)
+
+
+def test_general_channel(backend, precision):
     a1 = np.sqrt(0.4) * np.array([[0, 1], [1, 0]])
     a2 = np.sqrt(0.6) * np.array([[1, 0, 0, 0], [0, 1, 0, 0],
                                   [0, 0, 0, 1], [0, 0, 1, 0]])
@@ -424,11 +499,53 @@ def test_general_channel(backend):
     gate = gates.KrausChannel([((1,), a1), ((0, 1), a2)])
     assert gate.target_qubits == (0, 1)
     final_rho = gate(K.cast(np.copy(initial_rho)))
-    m1 = np.kron(np.eye(2), K.to_numpy(a1))
-    m2 = K.to_numpy(a2)
-    target_rho = (m1.dot(initial_rho).dot(m1.conj().T) +
-                  m2.dot(initial_rho).dot(m2.conj().T))
-    K.assert_allclose(final_rho, target_rho)
+    assert final_rho.dtype == K.dtypes('DTYPECPX')
+    target_rho = np.zeros_like(initial_rho)
+    for m, q in [(K.to_numpy(a1), (1,)), (K.to_numpy(a2), (0, 1))]:
+        rho = apply_local(initial_rho, m, q, 2)
+        target_rho += apply_local(rho, m.conj().T, q, 2, side="right")
+    tol = {"rtol": 1e-5, "atol": 1e-6} if precision == "single" else {}
+    K.assert_allclose(final_rho, target_rho, **tol)
+
+
+@pytest.mark.parametrize("qubits", [[(1,), (0, 1)], [(2,), (0, 1, 2)]])
+def test_general_channel_precision_switch(backend, qubits):
+    """Check that a Kraus channel follows precision changes after it is used."""
+    import qibo
+    original_precision = qibo.get_precision()
+    ops = [(q, np.random.random(2 * (2 ** len(q),))) for q in qubits]
+    gate = gates.KrausChannel(ops)
+    initial_rho = random_density_matrix(3)
+    target_rho = np.zeros_like(initial_rho)
+    for q, m in ops:
+        rho = apply_local(initial_rho, m, q, 3)
+        target_rho += apply_local(rho, m.conj().T, q, 3, side="right")
+    for precision in ["double", "single"]:
+        qibo.set_precision(precision)
+        final_rho = gate(K.cast(np.copy(initial_rho)))
+        assert final_rho.dtype == K.dtypes('DTYPECPX')
+        K.assert_allclose(final_rho, target_rho, rtol=1e-5, atol=1e-5)
+    qibo.set_precision(original_precision)
+
+
+@pytest.mark.parametrize("nqubits,qubits",
+                         [(3, [(2,), (2, 0)]), (3, [(0,), (2, 1), (1, 0)]),
+                          (4, [(3,), (1, 3), (2, 0, 3)])])
+def test_general_channel_unsorted_targets(backend, precision, nqubits, qubits):
+    """Check Kraus channels with unsorted and partially overlapping targets."""
+    ops = []
+    for q in qubits:
+        d = 2 ** len(q)
+        ops.append((q, np.random.random((d, d)) + 1j * np.random.random((d, d))))
+    initial_rho = random_density_matrix(nqubits)
+    gate = gates.KrausChannel([(q, K.cast(m)) for q, m in ops])
+    final_rho = gate(K.cast(np.copy(initial_rho)))
+    target_rho = np.zeros_like(initial_rho)
+    for q, m in ops:
+        rho = apply_local(initial_rho, m, q, nqubits)
+        target_rho += apply_local(rho, m.conj().T, q, nqubits, side="right")
+    tol = {"rtol": 1e-5, "atol": 1e-6} if precision == "single" else {}
+    K.assert_allclose(final_rho, target_rho, **tol)
 
 
 def test_krauss_channel_errors(backend):
@@ -467,12 +584,10 @@ def test_unitary_channel(backend):
     gate.density_matrix = True
     final_state = gate(K.cast(np.copy(initial_state)))
 
-    eye = np.eye(2)
-    ma1 = np.kron(np.kron(a1, eye), np.kron(eye, eye))
-    ma2 = np.kron(np.kron(eye, eye), a2)
-    target_state = (0.3 * initial_state
-                    + 0.4 * ma1.dot(initial_state.dot(ma1))
-                    + 0.3 * ma2.dot(initial_state.dot(ma2)))
+    target_state = 0.3 * initial_state
+    for p, (qubits, matrix) in zip(probs, matrices):
+        rho = apply_local(initial_state, matrix, qubits, 4)
+        target_state += p * apply_local(rho, matrix, qubits, 4, side="right")
     K.assert_allclose(final_state, target_state)
 
 
@@ -528,6 +643,19 @@ def test_pauli_noise_channel(backend):
     K.assert_allclose(final_rho, target_rho)
 
 
+def test_pauli_noise_channel_all_paulis(backend):
+    initial_rho = random_density_matrix(3)
+    gate = gates.PauliNoiseChannel(1, px=0.1, py=0.2, pz=0.3)
+    gate.density_matrix = True
+    final_rho = gate(K.cast(np.copy(initial_rho)))
+    target_rho = 0.4 * K.cast(np.copy(initial_rho))
+    for p, pauli in [(0.1, "X"), (0.2, "Y"), (0.3, "Z")]:
+        gate = getattr(gates, pauli)(1)
+        gate.density_matrix = True
+        target_rho += p * gate(K.cast(np.copy(initial_rho)))
+    K.assert_allclose(final_rho, target_rho)
+
+
 def test_reset_channel(backend):
     initial_rho = random_density_matrix(3)
     gate = gates.ResetChannel(0, p0=0.2, p1=0.2)
@@ -541,8 +669,8 @@ def test_reset_channel(backend):
     collapsed_rho[1, :, :, 1, :, :] = np.zeros(4 * (2,), dtype=dtype)
     collapsed_rho = collapsed_rho.reshape((8, 8))
     collapsed_rho /= np.trace(collapsed_rho)
-    mx = np.kron(np.array([[0, 1], [1, 0]]), np.eye(4))
-    flipped_rho = mx.dot(collapsed_rho.dot(mx))
+    flipped_rho = apply_local(collapsed_rho, X, (0,), 3)
+    flipped_rho = apply_local(flipped_rho, X, (0,), 3, side="right")
     target_rho = 0.6 * initial_rho + 0.2 * (collapsed_rho + flipped_rho)
     K.assert_allclose(final_rho, target_rho)
 
@@ -576,10 +704,10 @@ def test_thermal_relaxation_channel(backend, t1, t2, time, excpop):
         collapsed_rho[1, :, :, 1, :, :] = np.zeros(4 * (2,), dtype=dtype)
         collapsed_rho = collapsed_rho.reshape((8, 8))
         collapsed_rho /= np.trace(collapsed_rho)
-        mx = np.kron(np.array([[0, 1], [1, 0]]), np.eye(4))
-        mz = np.kron(np.array([[1, 0], [0, -1]]), np.eye(4))
-        z_rho = mz.dot(initial_rho.dot(mz))
-        flipped_rho = mx.dot(collapsed_rho.dot(mx))
+        z_rho = apply_local(initial_rho, Z, (0,), 3)
+        z_rho = apply_local(z_rho, Z, (0,), 3, side="right")
+        flipped_rho = apply_local(collapsed_rho, X, (0,), 3)
+        flipped_rho = apply_local(flipped_rho, X, (0,), 3, side="right")
         target_rho = (pi * initial_rho + pz * z_rho + p0 * collapsed_rho +
                       p1 * flipped_rho)
     K.assert_allclose(final_rho, target_rho)
@@ -612,7 +740,4 @@ def test_fused_gate_construct_unitary(backend):
     gate.add(gates.H(0))
     gate.add(gates.H(1))
     gate.add(gates.CZ(0, 1))
-    hmatrix = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
-    czmatrix = np.diag([1, 1, 1, -1])
-    target_matrix = czmatrix @ np.kron(hmatrix, hmatrix)
-    K.assert_allclose(gate.matrix, target_matrix)
+    K.assert_allclose(gate.matrix, TARGET_HCZ)
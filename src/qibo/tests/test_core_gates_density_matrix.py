@@ -1,50 +1,31 @@
 """Test gates defined in `qibo/core/cgates.py` and `qibo/core/gates.py` for density matrices."""
 import pytest
 import numpy as np
-from qibo import gates, K
+from qibo import gates, matrices, K
 from qibo.config import raise_error
+from qibo.tests.utils import apply_local
 
 _atol = 1e-8
 
+# target matrices shared by all backend parametrizations
+XZ = np.kron(matrices.X, matrices.Z)
 
-def random_density_matrix(nqubits):
-    """Generates a random density matrix.
 
-    Note that the density matrix generated by this method is not necessarily
-    positive. This is okay for most tests but may not work for some cases such
-    as the entanglement entropy calculation.
-
-    Args:
-        nqubits (int): Number of qubits in the density matrix.
-
-    Returns:
-        Density matrix as a numpy array of shape (2 ** nqubits, 2 ** nqubits).
-    """
-    shape = 2 * (2 ** nqubits,)
-    rho = np.random.random(shape) + 1j * np.random.random(shape)
-    # Make Hermitian
-    rho = (rho + rho.T.conj()) / 2.0
-    # Normalize
-    ids = np.arange(2 ** nqubits)
-    rho[ids, ids] = rho[ids, ids] / np.trace(rho)
-    return rho
-
-
-def test_hgate_density_matrix(backend):
-    initial_rho = random_density_matrix(2)
+def test_hgate_density_matrix(backend, random_rho):
+    initial_rho = random_rho[2]
     gate = gates.H(1)
     gate.density_matrix = True
     final_rho = gate(np.copy(initial_rho))
 
     matrix = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
-    matrix = np.kron(np.eye(2), matrix)
-    target_rho = matrix.dot(initial_rho).dot(matrix)
+    target_rho = apply_local(initial_rho, matrix, (1,), 2)
+    target_rho = apply_local(target_rho, matrix, (1,), 2, side="right")
     K.assert_allclose(final_rho, target_rho)
 
 
-def test_rygate_density_matrix(backend):
+def test_rygate_density_matrix(backend, random_rho):
     theta = 0.1234
-    initial_rho = random_density_matrix(1)
+    initial_rho = random_rho[1]
 
     gate = gates.RY(0, theta=theta)
     gate.density_matrix = True
@@ -65,9 +46,9 @@ def test_rygate_density_matrix(backend):
                           ("RZ", {"theta": 0.123}), ("U1", {"theta": 0.123}),
                           ("U2", {"phi": 0.123, "lam": 0.321}),
                           ("U3", {"theta": 0.123, "phi": 0.321, "lam": 0.123})])
-def test_one_qubit_gates(backend, gatename, gatekwargs):
+def test_one_qubit_gates(backend, random_rho, gatename, gatekwargs):
     """Check applying one qubit gates to one qubit density matrix."""
-    initial_rho = random_density_matrix(1)
+    initial_rho = random_rho[1]
     gate = getattr(gates, gatename)(0, **gatekwargs)
     gate.density_matrix = True
     final_rho = gate(np.copy(initial_rho))
@@ -78,8 +59,8 @@ def test_one_qubit_gates(backend, gatename, gatekwargs):
 
 
 @pytest.mark.parametrize("gatename", ["H", "X", "Y", "Z", "S", "SDG", "T", "TDG"])
-def test_controlled_by_one_qubit_gates(backend, gatename):
-    initial_rho = random_density_matrix(2)
+def test_controlled_by_one_qubit_gates(backend, random_rho, gatename):
+    initial_rho = random_rho[2]
     gate = getattr(gates, gatename)(1).controlled_by(0)
     gate.density_matrix = True
     final_rho = gate(np.copy(initial_rho))
@@ -98,9 +79,9 @@ def test_controlled_by_one_qubit_gates(backend, gatename):
                           ("CU2", {"phi": 0.123, "lam": 0.321}),
                           ("CU3", {"theta": 0.123, "phi": 0.321, "lam": 0.123}),
                           ("fSim", {"theta": 0.123, "phi": 0.543})])
-def test_two_qubit_gates(backend, gatename, gatekwargs):
+def test_two_qubit_gates(backend, random_rho, gatename, gatekwargs):
     """Check applying two qubit gates to two qubit density matrix."""
-    initial_rho = random_density_matrix(2)
+    initial_rho = random_rho[2]
     gate = getattr(gates, gatename)(0, 1, **gatekwargs)
     gate.density_matrix = True
     final_rho = gate(np.copy(initial_rho))
@@ -110,9 +91,34 @@ def test_two_qubit_gates(backend, gatename, gatekwargs):
     K.assert_allclose(final_rho, target_rho, atol=_atol)
 
 
-def test_toffoli_gate(backend):
+def test_two_qubit_gate_reuse(backend, random_rho):
+    """Check applying the same two qubit gate and channel more than once."""
+    initial_rho = random_rho[3]
+    gate = gates.CNOT(2, 0)
+    gate.density_matrix = True
+    matrix = K.to_numpy(gate.matrix)
+    for _ in range(2):
+        final_rho = gate(np.copy(initial_rho))
+        target_rho = apply_local(initial_rho, matrix, (2, 0), 3)
+        target_rho = apply_local(target_rho, matrix.T.conj(), (2, 0), 3,
+                                 side="right")
+        K.assert_allclose(final_rho, target_rho, atol=_atol)
+
+    a1 = np.sqrt(0.4) * XZ
+    a2 = np.sqrt(0.6) * np.eye(4)
+    channel = gates.KrausChannel([((0, 1), a1), ((0, 1), a2)])
+    channel.density_matrix = True
+    target_rho = apply_local(initial_rho, a1, (0, 1), 3)
+    target_rho = apply_local(target_rho, a1.T.conj(), (0, 1), 3, side="right")
+    target_rho += 0.6 * initial_rho
+    for _ in range(2):
+        final_rho = channel(np.copy(initial_rho))
+        K.assert_allclose(final_rho, target_rho, atol=_atol)
+
+
+def test_toffoli_gate(backend, random_rho):
     """Check applying Toffoli to three qubit density matrix."""
-    initial_rho = random_density_matrix(3)
+    initial_rho = random_rho[3]
     gate = gates.TOFFOLI(0, 1, 2)
     gate.density_matrix = True
     final_rho = gate(np.copy(initial_rho))
@@ -123,11 +129,11 @@ def test_toffoli_gate(backend):
 
 
 @pytest.mark.parametrize("nqubits", [1, 2, 3])
-def test_unitary_gate(backend, nqubits):
+def test_unitary_gate(backend, random_rho, nqubits):
     """Check applying `gates.Unitary` to density matrix."""
     shape = 2 * (2 ** nqubits,)
     matrix = np.random.random(shape) + 1j * np.random.random(shape)
-    initial_rho = random_density_matrix(nqubits)
+    initial_rho = random_rho[nqubits]
     from qibo import K
     gate = gates.Unitary(matrix, *range(nqubits))
     gate.density_matrix = True
@@ -140,25 +146,26 @@ def test_unitary_gate(backend, nqubits):
         K.assert_allclose(final_rho, target_rho)
 
 
-def test_cu1gate_application_twoqubit(backend):
+def test_cu1gate_application_twoqubit(backend, random_rho):
     """Check applying two qubit gate to three qubit density matrix."""
     theta = 0.1234
     nqubits = 3
-    initial_rho = random_density_matrix(nqubits)
+    initial_rho = random_rho[nqubits]
     gate = gates.CU1(0, 1, theta=theta)
     gate.density_matrix = True
     final_rho = gate(np.copy(initial_rho))
 
     matrix = np.eye(4, dtype=np.complex128)
     matrix[3, 3] = np.exp(1j * theta)
-    matrix = np.kron(matrix, np.eye(2))
-    target_rho = matrix.dot(initial_rho).dot(matrix.T.conj())
+    target_rho = apply_local(initial_rho, matrix, (0, 1), nqubits)
+    target_rho = apply_local(target_rho, matrix.T.conj(), (0, 1), nqubits,
+                             side="right")
     K.assert_allclose(final_rho, target_rho)
 
 
-def test_flatten_density_matrix(backend):
+def test_flatten_density_matrix(backend, random_rho):
     """Check ``Flatten`` gate works with density matrices."""
-    target_rho = random_density_matrix(3)
+    target_rho = random_rho[3]
     initial_rho = np.zeros(6 * (2,))
     gate = gates.Flatten(target_rho)
     gate.density_matrix = True
@@ -193,13 +200,13 @@ def test_controlled_with_effect(backend):
     c.add(gates.X(0))
     c.add(gates.X(2))
     c.add(gates.SWAP(1, 3).controlled_by(0, 2))
-    final_rho = c(np.copy(initial_rho)).numpy()
+    final_rho = c(np.copy(initial_rho))
 
     c = Circuit(4, density_matrix=True)
     c.add(gates.X(0))
     c.add(gates.X(2))
     c.add(gates.SWAP(1, 3))
-    target_rho = c(np.copy(initial_rho)).numpy()
+    target_rho = c(np.copy(initial_rho))
     K.assert_allclose(final_rho, target_rho)
 
 
@@ -224,10 +231,10 @@ def test_controlled_by_random(backend, nqubits):
 
 
 @pytest.mark.parametrize("qubit", [0, 1, 2])
-def test_partial_trace_gate(backend, qubit):
+def test_partial_trace_gate(backend, random_rho, qubit):
     gate = gates.PartialTrace(qubit)
     gate.density_matrix = True
-    initial_rho = random_density_matrix(3)
+    initial_rho = random_rho[3]
     final_state = gate(np.copy(initial_rho))
 
     zero_state = np.array([[1, 0], [0, 0]])
@@ -272,9 +279,8 @@ def test_channel_gate_setters(backend):
 
 def test_measurement_density_matrix(backend):
     from qibo.tests.test_measurement_gate import assert_result
-    state = np.zeros(4)
-    state[2] = 1
-    rho = np.outer(state, state.conj())
+    rho = np.zeros((4, 4))
+    rho[2, 2] = 1
     mgate = gates.M(0, 1)
     mgate.density_matrix = True
     result = mgate(K.cast(rho), nshots=100)
@@ -67,13 +67,11 @@ def test_vector_state_state_copy(backend, deep):
 
 
 @pytest.mark.parametrize("deep", [False, True])
-def test_vector_state_state_deepcopy(deep):
+def test_vector_state_state_deepcopy(switch_backend, deep):
     """Check if deep copy is really deep."""
     # use numpy backend as tensorflow tensors are immutable and cannot
     # change their value for testing
-    import qibo
-    original_backend = qibo.get_backend()
-    qibo.set_backend("numpy")
+    switch_backend("numpy")
     vector = np.random.random(32) + 1j * np.random.random(32)
     vector = vector / np.sqrt((np.abs(vector) ** 2).sum())
     state = states.VectorState.from_tensor(vector)
@@ -86,7 +84,6 @@ def test_vector_state_state_deepcopy(deep):
         K.assert_allclose(cstate.tensor[1:], state.tensor[1:])
     else:
         K.assert_allclose(cstate.tensor, state.tensor)
-    qibo.set_backend(original_backend)
 
 
 @pytest.mark.parametrize("deep", [False, True])
@@ -132,11 +132,10 @@ def test_vqe(backend, method, options, compile, filename, skip_parallel):
     qibo.set_threads(original_threads)
 
 
-def test_vqe_custom_gates_errors():
+def test_vqe_custom_gates_errors(switch_backend):
     """Check that ``RuntimeError``s is raised when using custom gates."""
-    original_backend = qibo.get_backend()
     try:
-        qibo.set_backend("qibotf")
+        switch_backend("qibotf")
     except ValueError:  # pragma: no cover
         pytest.skip("Custom backend not available.")
 
@@ -158,7 +157,6 @@ def test_vqe_custom_gates_errors():
     with pytest.raises(RuntimeError):
         best, params, _ = v.minimize(initial_parameters, method="sgd",
                                      compile=False)
-    qibo.set_backend(original_backend)
 
 
 def test_initial_state(backend, accelerators):
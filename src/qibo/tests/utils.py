@@ -11,7 +11,8 @@ def random_complex(shape, dtype=None):
 def random_hermitian(nqubits):
     shape = 2 * (2 ** nqubits,)
     m = random_complex(shape)
-    return m + m.T.conj()
+    m += m.T.conj()
+    return m
 
 
 def random_state(nqubits):
@@ -25,5 +26,36 @@ def random_density_matrix(nqubits):
     rho = random_hermitian(nqubits)
     # Normalize
     ids = np.arange(2 ** nqubits)
-    rho[ids, ids] = rho[ids, ids] / np.trace(rho)
+    rho[ids, ids] /= np.trace(rho)
     return rho
+
+
+def apply_local(rho, matrix, qubits, nqubits, side="left"):
+    """Multiplies a density matrix with a matrix acting on some of its qubits.
+
+    Equivalent to multiplying ``rho`` with ``matrix`` lifted to all qubits
+    via Kronecker products with identities, without constructing the full
+    ``(2 ** nqubits, 2 ** nqubits)`` matrix.
+
+    Args:
+        rho (np.ndarray): Density matrix of shape ``(2 ** nqubits, 2 ** nqubits)``.
+        matrix (np.ndarray): Matrix acting on ``qubits``.
+        qubits (tuple): Qubit ids that ``matrix`` acts on.
+        nqubits (int): Total number of qubits of ``rho``.
+        side (str): ``"left"`` returns ``matrix @ rho`` and ``"right"``
+            returns ``rho @ matrix``.
+    """
+    qubits = list(qubits)
+    k = len(qubits)
+    rho = np.reshape(rho, 2 * nqubits * (2,))
+    matrix = np.reshape(matrix, 2 * k * (2,))
+    if side == "left":
+        rho = np.tensordot(matrix, rho, axes=[list(range(k, 2 * k)), qubits])
+        rho = np.moveaxis(rho, range(k), qubits)
+    elif side == "right":
+        axes = [q + nqubits for q in qubits]
+        rho = np.tensordot(rho, matrix, axes=[axes, list(range(k))])
+        rho = np.moveaxis(rho, range(2 * nqubits - k, 2 * nqubits), axes)
+    else:
+        raise ValueError(f"Unknown side {side}.")
+    return np.reshape(rho, 2 * (2 ** nqubits,))